@@ -3,8 +3,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from config import Config
+from app.engine import RoutingSession, configure_engines, engine_options, init_read_replica
+from app.fragments import init_fragment_cache
+from app.http_cache import init_http_cache
+from app.profiling import init_profiling
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 login = LoginManager()
 login.login_view = 'auth.login'
@@ -13,17 +17,32 @@ login.login_message = 'Please log in to access this page.'
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    )
+
+    init_read_replica(app, db)
 
     db.init_app(app)
+    configure_engines(app, db)
+    init_profiling(app, db)
+    init_fragment_cache(app)
+    init_http_cache(app)
     migrate.init_app(app, db)
     login.init_app(app)
 
-    from app.routes import auth, main, decks, classes, study, cards
+    from app.services import generation, passwords, users
+    generation.init_app(app)
+    passwords.init_app(app)
+
+    from app.routes import auth, main, decks, classes, study, cards, exports, admin
     app.register_blueprint(auth.bp)
     app.register_blueprint(main.bp)
     app.register_blueprint(decks.bp)
     app.register_blueprint(classes.bp)
     app.register_blueprint(study.bp)
     app.register_blueprint(cards.bp)
+    app.register_blueprint(exports.bp)
+    app.register_blueprint(admin.bp)
 
     return app
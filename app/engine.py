@@ -0,0 +1,122 @@
+"""Engine options, connection setup and read-replica routing.
+
+SQLite connections get their pragmas on connect (WAL journaling lets readers
+carry on while a writer commits); MySQL gets a sized, pre-pinged and recycled
+connection pool.
+
+When ``SQLALCHEMY_READ_REPLICA_URI`` is set, GET requests to views marked with
+``@reads_from_replica`` send their SELECTs to that database. Everything else,
+and every statement after the first write in a request, uses the primary. A
+user who wrote recently stays on the primary for ``READ_REPLICA_STICKY_SECONDS``
+so replication lag never hides their own changes.
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = 'replica'
+
+
+def engine_options(uri, config):
+    """Default ``create_engine`` options for the database at ``uri``."""
+    backend = make_url(uri).get_backend_name()
+    if backend == 'mysql':
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_recycle': config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': True,
+        }
+    return {}
+
+
+def sqlite_pragmas(config):
+    pragmas = {
+        'journal_mode': config['SQLITE_JOURNAL_MODE'],
+        'synchronous': config['SQLITE_SYNCHRONOUS'],
+        'busy_timeout': config['SQLITE_BUSY_TIMEOUT_MS'],
+        # Negative cache_size is in KiB rather than pages
+        'cache_size': -config['SQLITE_CACHE_SIZE_KB'] if config['SQLITE_CACHE_SIZE_KB'] else None,
+        'mmap_size': config['SQLITE_MMAP_SIZE'],
+    }
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+
+def configure_engines(app, db):
+    """Attach the SQLite pragma hook to every SQLite engine of ``app``."""
+    pragmas = sqlite_pragmas(app.config)
+    if not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', set_pragmas)
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the read replica when the request allows it."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if not getattr(clause, 'is_select', False):
+                # Flushes, DML and anything unrecognised go to the primary
+                self.info['wrote'] = True
+            elif self.info.get('use_replica') and not self.info.get('wrote'):
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def reads_from_replica(view):
+    """Mark a view whose GET requests only read and may use the replica."""
+    view.reads_from_replica = True
+    return view
+
+
+@contextmanager
+def primary_reads(db_session):
+    """Send the SELECTs run inside the block to the primary, even in a replica view."""
+    previous = db_session.info.get('use_replica')
+    db_session.info['use_replica'] = False
+    try:
+        yield
+    finally:
+        db_session.info['use_replica'] = previous
+
+
+def init_read_replica(app, db):
+    uri = app.config.get('SQLALCHEMY_READ_REPLICA_URI')
+    if not uri:
+        return
+
+    binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+    binds.setdefault(REPLICA_BIND, dict(engine_options(uri, app.config), url=uri))
+
+    @app.before_request
+    def route_reads():
+        view = current_app.view_functions.get(request.endpoint)
+        if request.method not in ('GET', 'HEAD') or not getattr(view, 'reads_from_replica', False):
+            return
+        last_write = session.get('_db_write_at', 0)
+        if time.time() - last_write < current_app.config['READ_REPLICA_STICKY_SECONDS']:
+            return
+        db.session.info['use_replica'] = True
+
+    @app.after_request
+    def remember_write(response):
+        if db.session.info.get('wrote'):
+            session['_db_write_at'] = time.time()
+        return response
@@ -0,0 +1,275 @@
+"""Cached template fragments.
+
+Templates wrap rarely changing sections in ``{% cache 'name' %}...{% endcache %}``.
+A rendered section is stored under the current user's id plus their data
+version. The version is a random token kept per user and per class they belong
+to. Invalidation replaces the token, so later requests miss and re-render, and
+the old fragments age out of the backend. Everything a cached section shows
+should be loaded inside the block, so a hit skips those queries as well as the
+rendering. A miss always renders from the primary database, even in views
+that read from the replica.
+
+``FRAGMENT_CACHE_BACKEND`` picks where fragments and tokens live:
+
+- ``memory``: a per-process LRU (the default).
+- ``filesystem``: one file per entry under ``FRAGMENT_CACHE_PATH``.
+- ``sqlite``: a table in the SQLite file ``FRAGMENT_CACHE_PATH``.
+- ``none``: always render.
+
+The filesystem and SQLite backends are shared by every worker on a host, so
+an invalidation in one worker reaches the others. Their content is served as
+trusted HTML, so they live in a directory only the app's user can open,
+``fragment-cache`` in the instance folder unless ``FRAGMENT_CACHE_PATH`` says
+otherwise. Call ``invalidate`` or
+``invalidate_deck`` after committing the change.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from flask import current_app
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from app.services.cache import TTLCache
+
+# Expired entries are swept once every this many writes
+PRUNE_EVERY = 200
+
+
+class MemoryBackend:
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def clear(self):
+        self._cache.clear()
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+class FilesystemBackend:
+    """One file per key, expired by modification time."""
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        self._writes = 0
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl <= time.time():
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key, value):
+        # Write then rename, so readers in other workers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(value)
+        os.replace(tmp, self._path(key))
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime <= cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class SQLiteBackend:
+    """Entries in a standalone SQLite file, trimmed to ``maxsize`` rows."""
+
+    def __init__(self, path, maxsize, ttl):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS fragments '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_fragments_expires_at ON fragments (expires_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM fragments WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO fragments (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, time.time() + self.ttl)
+            )
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM fragments WHERE expires_at <= ?', (time.time(),))
+            conn.execute(
+                'DELETE FROM fragments WHERE key IN '
+                '(SELECT key FROM fragments ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.maxsize,)
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM fragments')
+
+
+def make_backend(config, instance_path):
+    """Build the backend selected by ``FRAGMENT_CACHE_BACKEND``.
+
+    Without ``FRAGMENT_CACHE_PATH``, the filesystem and SQLite backends use a
+    ``fragment-cache`` directory under ``instance_path``.
+    """
+    name = config['FRAGMENT_CACHE_BACKEND']
+    ttl = config['FRAGMENT_CACHE_TTL']
+    maxsize = config['FRAGMENT_CACHE_MAX_ENTRIES']
+    path = config.get('FRAGMENT_CACHE_PATH')
+    default_dir = os.path.join(instance_path, 'fragment-cache')
+
+    if name == 'memory':
+        return MemoryBackend(maxsize, ttl)
+    if name == 'filesystem':
+        return FilesystemBackend(path or default_dir, ttl)
+    if name == 'sqlite':
+        return SQLiteBackend(path or os.path.join(default_dir, 'fragments.db'), maxsize, ttl)
+    if name == 'none':
+        return NullBackend()
+    raise ValueError(f"Unknown FRAGMENT_CACHE_BACKEND '{name}'.")
+
+
+class FragmentCache:
+    """Per-app fragment cache, stored in ``app.extensions``."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _token(self, scope):
+        key = f'version:{scope}'
+        token = self.backend.get(key)
+        if token is None:
+            # A lost or expired token only costs a miss: the new one matches no fragment
+            token = uuid.uuid4().hex
+            self.backend.set(key, token)
+        return token
+
+    def data_version(self, user):
+        scopes = [f'user:{user.id}'] + [f'class:{class_id}' for class_id in sorted(user.class_ids)]
+        tokens = '.'.join(self._token(scope) for scope in scopes)
+        return hashlib.sha1(tokens.encode()).hexdigest()
+
+    def fetch(self, name, render):
+        """Return the fragment ``name`` for the current user, calling ``render()`` on a miss."""
+        if not current_user.is_authenticated:
+            return render()
+
+        key = f'fragment:{name}:{current_user.id}:{self.data_version(current_user)}'
+        html = self.backend.get(key)
+        if html is None:
+            from app import db
+            from app.engine import primary_reads
+
+            # The token was swapped right after a commit; a lagging replica could still
+            # return the old rows, which would then be cached under the new token
+            with primary_reads(db.session):
+                html = render()
+            self.backend.set(key, str(html))
+        return Markup(html)
+
+    def invalidate(self, user_ids=(), class_ids=()):
+        scopes = [f'user:{user_id}' for user_id in set(user_ids) if user_id is not None]
+        scopes += [f'class:{class_id}' for class_id in set(class_ids) if class_id is not None]
+        for scope in scopes:
+            self.backend.set(f'version:{scope}', uuid.uuid4().hex)
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache 'name' %}...{% endcache %}``: cache the body per user and data version."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_fetch', [name]), [], [], body).set_lineno(lineno)
+
+    def _fetch(self, name, caller):
+        return fragment_cache().fetch(name, caller)
+
+
+def init_fragment_cache(app):
+    app.extensions['fragments'] = FragmentCache(make_backend(app.config, app.instance_path))
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+def fragment_cache(app=None):
+    return (app or current_app).extensions['fragments']
+
+
+def invalidate(user_ids=(), class_ids=()):
+    fragment_cache().invalidate(user_ids, class_ids)
+
+
+def invalidate_deck(deck):
+    """Invalidate the pages listing ``deck``: its owner's and, for a class deck, the class members'."""
+    invalidate(user_ids=[deck.owner_id], class_ids=[deck.class_id])
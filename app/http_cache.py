@@ -0,0 +1,64 @@
+"""HTTP validators for deck pages and payloads.
+
+A deck's content only changes with a new ``content_version`` or
+``updated_at``, so views can build a strong ETag from those and answer a
+matching ``If-None-Match`` with 304 before loading or serializing any cards.
+Tags also cover a digest of the app's templates, so a deploy that changes the
+markup never revalidates an old page.
+"""
+import hashlib
+
+from flask import current_app, make_response, request, session
+
+# Per-user pages: browsers keep them but revalidate on every visit
+PAGE_CACHE_CONTROL = 'private, no-cache'
+
+
+def init_http_cache(app):
+    digest = hashlib.sha1()
+    for name in sorted(app.jinja_env.list_templates()):
+        source, _, _ = app.jinja_loader.get_source(app.jinja_env, name)
+        digest.update(name.encode())
+        digest.update(source.encode())
+    app.extensions['http_cache'] = digest.hexdigest()[:16]
+
+
+def deck_etag(deck, *parts):
+    """Strong ETag for a representation of ``deck``; ``parts`` tell representations apart."""
+    key = [current_app.extensions['http_cache'], deck.id, deck.content_version, deck.updated_at.isoformat()]
+    key.extend(parts)
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def payload_cache_control():
+    # Only served to logged-in users with access to the deck, so only the browser may keep it
+    return f"private, max-age={current_app.config['STUDY_PAYLOAD_MAX_AGE']}"
+
+
+def not_modified(etag, last_modified=None):
+    """True if the request already holds this representation.
+
+    ``If-Modified-Since`` is only honoured when ``last_modified`` is given,
+    i.e. for representations that are the same for every user. A page with
+    flashed messages waiting to be shown is always sent in full.
+    """
+    if '_flashes' in session:
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def with_validators(response, etag, last_modified, cache_control):
+    response = make_response(response)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Cookie')
+    return response
+
+
+def not_modified_response(etag, last_modified, cache_control):
+    return with_validators(('', 304), etag, last_modified, cache_control)
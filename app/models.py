@@ -1,7 +1,7 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from flask_login import UserMixin
-from app import db, login
+from app import db
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -15,20 +15,27 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.services.passwords import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    @property
+    def class_ids(self):
+        # Same cached lookup as the current_user snapshot (app.services.users)
+        from app.services.access import class_ids
+        return class_ids(self.id)
+
     def __repr__(self):
         return f'<User {self.email}>'
 
-@login.user_loader
-def load_user(id):
-    return User.query.get(int(id))
-
 class Deck(db.Model):
     __tablename__ = 'decks'
+    __table_args__ = (
+        db.Index('ix_decks_owner_visibility', 'owner_id', 'visibility'),
+        db.Index('ix_decks_class_visibility', 'class_id', 'visibility'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(255), nullable=False)
@@ -37,8 +44,13 @@ class Deck(db.Model):
     question_type = db.Column(db.Enum('flashcard', 'fill_gap', 'mcq'), default='flashcard', nullable=False)
     class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Incremented whenever the deck's cards change; keys the cached study payload
+    content_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Set on every UPDATE of the row (renames and content_version bumps); drives the HTTP validators
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     cards = db.relationship('Card', backref='deck', lazy='dynamic', cascade='all, delete-orphan')
+    generation_jobs = db.relationship('GenerationJob', backref='deck', lazy='dynamic', cascade='all, delete-orphan')
 
 class Card(db.Model):
     # This table stores all types of cards (flashcards, fill-in-the-gap, multiple choice)
@@ -46,7 +58,7 @@ class Card(db.Model):
     
     # Basic card information
     id = db.Column(db.Integer, primary_key=True)
-    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=False)
+    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=False, index=True)
     card_type = db.Column(db.Enum('flashcard', 'fill_gap', 'mcq'), nullable=False)
     
     # Columns for Flashcards
@@ -82,6 +94,10 @@ class Card(db.Model):
 
 class CardProgress(db.Model):
     __tablename__ = 'card_progress'
+    __table_args__ = (
+        # Due-card lookups: WHERE user_id = ? AND next_review_date <= ?
+        db.Index('ix_card_progress_user_next_review', 'user_id', 'next_review_date'),
+    )
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     card_id = db.Column(db.Integer, db.ForeignKey('cards.id'), primary_key=True)
     next_review_date = db.Column(db.Date, nullable=True)
@@ -110,6 +126,10 @@ class ClassMember(db.Model):
 
 class StudyResult(db.Model):
     __tablename__ = 'study_results'
+    __table_args__ = (
+        # Stats range scans by user and date, filtered by question type
+        db.Index('ix_study_results_user_completed_type', 'user_id', 'completed_at', 'question_type'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=False)
@@ -118,4 +138,50 @@ class StudyResult(db.Model):
     question_type = db.Column(db.String(50), nullable=False)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-
+class StudyDailyRollup(db.Model):
+    # Per-user daily totals of study_results, maintained by app.services.rollup
+    __tablename__ = 'study_daily_rollup'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    question_type = db.Column(db.String(50), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    passes = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    max_score_sum = db.Column(db.Integer, nullable=False, default=0)
+
+class GenerationJob(db.Model):
+    # Background AI quiz generation requests, run by app.services.generation
+    __tablename__ = 'generation_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    deck_id = db.Column(db.Integer, db.ForeignKey('decks.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.Enum('queued', 'running', 'done', 'failed'), nullable=False, default='queued')
+    source_content = db.Column(db.Text, nullable=False)
+    num_questions = db.Column(db.Integer, nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)
+    chunks_total = db.Column(db.Integer, nullable=False, default=0)
+    chunks_done = db.Column(db.Integer, nullable=False, default=0)
+    cards_created = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'chunks_total': self.chunks_total,
+            'chunks_done': self.chunks_done,
+            'cards_created': self.cards_created,
+            'error': self.error,
+        }
+
+class GeneratedQuestionCache(db.Model):
+    # Parsed AI question lists keyed by content hash, see app.services.question_cache
+    __tablename__ = 'generation_cache'
+    key = db.Column(db.String(64), primary_key=True)
+    model_name = db.Column(db.String(100), nullable=False)
+    questions_json = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
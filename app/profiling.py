@@ -0,0 +1,163 @@
+"""Opt-in per-request query profiling (``PROFILE_REQUESTS``).
+
+Every SQL statement is timed through the engines' cursor events, and template
+rendering through Flask's template signals. For each request the totals are
+returned in ``X-DB-*`` and ``Server-Timing`` headers and written as one JSON log
+line. They are also kept per endpoint for the ``/admin/metrics`` percentiles.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+# Statements reported per request, and recent requests kept per endpoint
+SLOWEST_STATEMENTS = 5
+SAMPLES_PER_ENDPOINT = 1000
+
+
+class RequestProfile:
+    __slots__ = ('started', 'queries', 'db_seconds', 'statements', 'render_seconds', 'render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = []
+        self.render_seconds = 0.0
+        self.render_started = None
+
+    def slowest(self, n=SLOWEST_STATEMENTS):
+        top = sorted(self.statements, reverse=True)[:n]
+        return [{'ms': round(seconds * 1000, 2), 'sql': ' '.join(sql.split())[:300]} for seconds, sql in top]
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Profiler:
+    """Keeps the most recent request samples per endpoint."""
+
+    def __init__(self, samples=SAMPLES_PER_ENDPOINT):
+        self._samples = defaultdict(lambda: deque(maxlen=samples))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, total_ms, db_ms, render_ms, queries):
+        with self._lock:
+            self._samples[endpoint].append((total_ms, db_ms, render_ms, queries))
+            self._counts[endpoint] += 1
+
+    def summary(self):
+        with self._lock:
+            snapshot = {endpoint: (self._counts[endpoint], list(samples)) for endpoint, samples in self._samples.items()}
+
+        summary = {}
+        for endpoint, (count, samples) in sorted(snapshot.items()):
+            columns = dict(zip(('total_ms', 'db_ms', 'render_ms', 'queries'), zip(*samples)))
+            stats = {'requests': count, 'sampled': len(samples)}
+            for name, values in columns.items():
+                ordered = sorted(values)
+                stats[name] = {
+                    'p50': round(_percentile(ordered, 0.50), 2),
+                    'p95': round(_percentile(ordered, 0.95), 2),
+                    'p99': round(_percentile(ordered, 0.99), 2),
+                    'max': round(ordered[-1], 2),
+                }
+            summary[endpoint] = stats
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+def _current_profile():
+    return g.get('_profile') if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['profile_query_start'].pop()
+    profile = _current_profile()
+    if profile is not None:
+        profile.queries += 1
+        profile.db_seconds += elapsed
+        profile.statements.append((elapsed, statement))
+
+
+def _before_render(sender, template, context, **extra):
+    profile = _current_profile()
+    if profile is not None:
+        profile.render_started = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    profile = _current_profile()
+    if profile is not None and profile.render_started is not None:
+        profile.render_seconds += time.perf_counter() - profile.render_started
+        profile.render_started = None
+
+
+def init_profiling(app, db):
+    if not app.config.get('PROFILE_REQUESTS'):
+        return
+
+    profiler = Profiler()
+    app.extensions['profiler'] = profiler
+    if not app.logger.level:
+        app.logger.setLevel(logging.INFO)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_profile():
+        g._profile = RequestProfile()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        db_ms = profile.db_seconds * 1000
+        render_ms = profile.render_seconds * 1000
+        endpoint = request.endpoint or 'unmatched'
+
+        response.headers['X-DB-Query-Count'] = str(profile.queries)
+        response.headers['X-DB-Time-Ms'] = f'{db_ms:.2f}'
+        response.headers['Server-Timing'] = (
+            f'db;dur={db_ms:.2f};desc="{profile.queries} queries", render;dur={render_ms:.2f}, total;dur={total_ms:.2f}'
+        )
+
+        profiler.record(endpoint, total_ms, db_ms, render_ms, profile.queries)
+        app.logger.info(json.dumps({
+            'event': 'request_profile',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'queries': profile.queries,
+            'db_ms': round(db_ms, 2),
+            'render_ms': round(render_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'slowest': profile.slowest(),
+        }))
+        return response
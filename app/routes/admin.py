@@ -0,0 +1,29 @@
+import hmac
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+def _authorized(token):
+    # Header only: a query-string token would end up in access and proxy logs
+    supplied = request.headers.get('X-Metrics-Token') or ''
+    # Bytes, since compare_digest rejects str with non-ASCII characters
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+def _local_access_allowed():
+    # Opt-in only: behind a local reverse proxy every request comes from 127.0.0.1
+    return current_app.config.get('METRICS_ALLOW_LOCALHOST') and request.remote_addr in ('127.0.0.1', '::1')
+
+@bp.route('/metrics')
+def metrics():
+    profiler = current_app.extensions.get('profiler')
+    token = current_app.config.get('METRICS_TOKEN')
+    if profiler is None or not (token or current_app.config.get('METRICS_ALLOW_LOCALHOST')):
+        abort(404)
+    if not ((token and _authorized(token)) or _local_access_allowed()):
+        abort(403)
+    if request.args.get('reset'):
+        summary = profiler.summary()
+        profiler.reset()
+        return jsonify(summary)
+    return jsonify(profiler.summary())
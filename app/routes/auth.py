@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, current_user
 from app import db
 from app.models import User
+from app.services import passwords
 
 bp = Blueprint('auth', __name__)
 
@@ -15,10 +16,12 @@ def login():
         password = request.form['password']
         user = User.query.filter_by(email=email).first()
         
-        if user is None or not user.check_password(password):
+        if user is None or not passwords.check_login(user, password):
             flash('Invalid email or password', 'error')
             return redirect(url_for('auth.login'))
             
+        # Saves the rehashed password, if check_login upgraded it
+        db.session.commit()
         login_user(user)
         return redirect(url_for('auth.login'))
         
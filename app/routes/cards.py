@@ -1,7 +1,8 @@
 from flask import Blueprint, redirect, url_for, flash
 from flask_login import login_required, current_user
-from app import db
+from app import db, fragments
 from app.models import Card
+from app.services.decks import bump_content_version
 
 bp = Blueprint('cards', __name__, url_prefix='/cards')
 
@@ -17,7 +18,9 @@ def delete(card_id):
         
     try:
         db.session.delete(card)
+        bump_content_version(deck)
         db.session.commit()
+        fragments.invalidate_deck(deck)
         flash('Card deleted successfully.', 'success')
     except Exception as e:
         db.session.rollback()
@@ -82,7 +85,9 @@ def edit(card_id):
                 card.question_text = question_text
                 card.answers_json = json.dumps([answer])
 
+            bump_content_version(deck)
             db.session.commit()
+            fragments.invalidate_deck(deck)
             flash('Card updated successfully!', 'success')
             return redirect(url_for('decks.view', deck_id=deck.id))
             
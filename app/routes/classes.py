@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
-from app import db
-from app.models import Class, Deck, User, ClassMember, Card, CardProgress
+from app import db, fragments
+from app.engine import reads_from_replica
+from app.models import Class, Deck, User, ClassMember
+from app.services.decks import card_counts
+from app.services.progress import deck_progress, class_analytics, invalidate_class_analytics
 from datetime import datetime
 import string
 import random
@@ -36,6 +39,7 @@ def create():
         )
         db.session.add(new_class)
         db.session.commit()
+        fragments.invalidate(user_ids=[current_user.id])
         
         flash('Class created successfully!', 'success')
         return redirect(url_for('classes.view', class_id=new_class.id))
@@ -44,16 +48,12 @@ def create():
 
 @bp.route('/<int:class_id>')
 @login_required
+@reads_from_replica
 def view(class_id):
     class_obj = Class.query.get_or_404(class_id)
     
     is_teacher = (current_user.id == class_obj.teacher_id)
-    is_member = False
-    
-    if current_user.role == 'student':
-        membership = ClassMember.query.filter_by(student_id=current_user.id, class_id=class_id).first()
-        if membership:
-            is_member = True
+    is_member = current_user.role == 'student' and class_id in current_user.class_ids
             
     if not is_teacher and not is_member:
         flash('You do not have access to this class.', 'error')
@@ -62,29 +62,46 @@ def view(class_id):
     decks = Deck.query.filter_by(class_id=class_id).all()
 
     if current_user.role == 'student':
-        deck_progress = {}
-        for deck in decks:
-            total_cards = deck.cards.count()
-            if total_cards > 0:
-                learned_count = CardProgress.query.join(Card).filter(
-                    Card.deck_id == deck.id,
-                    CardProgress.user_id == current_user.id
-                ).count()
-                progress_percent = int((learned_count / total_cards) * 100)
-                deck_progress[deck.id] = progress_percent
-            else:
-                deck_progress[deck.id] = 0
+        progress = deck_progress(current_user.id, [deck.id for deck in decks])
                 
         return render_template('classes/student_view.html',
                                class_obj=class_obj,
                                decks=decks,
-                               deck_progress=deck_progress)
+                               deck_progress={deck_id: p.percent for deck_id, p in progress.items()},
+                               card_counts={deck_id: p.total_cards for deck_id, p in progress.items()})
     
     return render_template('classes/view.html', 
                            class_obj=class_obj, 
                            decks=decks, 
+                           card_counts=card_counts(deck.id for deck in decks),
                            is_teacher=is_teacher)
 
+@bp.route('/<int:class_id>/analytics')
+@login_required
+@reads_from_replica
+def analytics(class_id):
+    class_obj = Class.query.get_or_404(class_id)
+    if class_obj.teacher_id != current_user.id:
+        flash('Only the class teacher can view analytics.', 'error')
+        return redirect(url_for('classes.view', class_id=class_id))
+
+    return render_template('classes/analytics.html',
+                           class_obj=class_obj,
+                           students=class_analytics(class_id))
+
+@bp.route('/<int:class_id>/analytics.json')
+@login_required
+@reads_from_replica
+def analytics_data(class_id):
+    class_obj = Class.query.get_or_404(class_id)
+    if class_obj.teacher_id != current_user.id:
+        return jsonify({'error': 'Only the class teacher can view analytics'}), 403
+
+    return jsonify({
+        'class_id': class_obj.id,
+        'students': [student.to_dict() for student in class_analytics(class_id)]
+    })
+
 @bp.route('/join', methods=['GET', 'POST'])
 @login_required
 def join():
@@ -106,6 +123,9 @@ def join():
         membership = ClassMember(student_id=current_user.id, class_id=class_obj.id)
         db.session.add(membership)
         db.session.commit()
+        invalidate_class_analytics([class_obj.id])
+        # The student's class list and the teacher's member count
+        fragments.invalidate(user_ids=[current_user.id, class_obj.teacher_id])
         
         flash(f'Successfully joined {class_obj.name}!', 'success')
         return redirect(url_for('classes.view', class_id=class_obj.id))
@@ -120,9 +140,12 @@ def delete(class_id):
         flash('You do not have permission to delete this class.', 'error')
         return redirect(url_for('classes.view', class_id=class_obj.id))
         
+    teacher_id = class_obj.teacher_id
     try:
         db.session.delete(class_obj)
         db.session.commit()
+        invalidate_class_analytics([class_id])
+        fragments.invalidate(user_ids=[teacher_id], class_ids=[class_id])
         flash('Class deleted successfully.', 'success')
         return redirect(url_for('main.dashboard'))
     except Exception as e:
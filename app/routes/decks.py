@@ -1,11 +1,21 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
-from app import db
-from app.models import Deck
+from app import db, fragments
+from app.engine import reads_from_replica
+from app.http_cache import (PAGE_CACHE_CONTROL, deck_etag, not_modified, not_modified_response,
+                            payload_cache_control, with_validators)
+from app.models import Deck, GenerationJob
+from app.services import access, generation
+from app.services.cards import card_fields
+from app.services.importer import detect_format, import_cards, IMPORT_FORMATS
+from app.services.decks import card_counts, bump_content_version, card_page, forget_card_pages, CARD_PAGE_SIZE
 from datetime import datetime
 
 bp = Blueprint('decks', __name__, url_prefix='/decks')
 
+# Largest page the card API will return in one response
+MAX_CARD_PAGE_SIZE = 200
+
 @bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create():
@@ -41,6 +51,7 @@ def create():
         
         db.session.add(deck)
         db.session.commit()
+        fragments.invalidate_deck(deck)
         
         flash('Deck created successfully!', 'success')
         return redirect(url_for('main.dashboard'))
@@ -56,45 +67,82 @@ def create():
 
 @bp.route('/list')
 @login_required
+@reads_from_replica
 def list():
+    # Loaded from the template's cached fragment
+    return render_template('decks/list.html', load_lists=_deck_lists)
+
+def _deck_lists():
     private_decks = Deck.query.filter_by(owner_id=current_user.id, visibility='private').all()
     
     class_decks = []
     
     # Check if the user is a student
     if current_user.role == 'student':
-        # Create an empty list to store the class IDs
-        joined_class_ids = []
-        
-        # Loop through each class the student is enrolled in
-        for member in current_user.enrolled_classes:
-            joined_class_ids.append(member.class_id)
+        joined_class_ids = current_user.class_ids
             
         # If the student is in any classes, get the decks for those classes
-        if len(joined_class_ids) > 0:
+        if joined_class_ids:
             class_decks = Deck.query.filter(Deck.visibility == 'class', Deck.class_id.in_(joined_class_ids)).all()
     else:
         class_decks = Deck.query.filter_by(owner_id=current_user.id, visibility='class').all()
 
-    return render_template('decks/list.html', private_decks=private_decks, class_decks=class_decks)
+    counts = card_counts(deck.id for deck in private_decks + class_decks)
+
+    return {'private_decks': private_decks, 'class_decks': class_decks, 'card_counts': counts}
+
+def _cards_page_url(deck_id, after, limit=CARD_PAGE_SIZE):
+    if after is None:
+        return None
+    return url_for('decks.list_cards', deck_id=deck_id, after=after, limit=limit)
 
 @bp.route('/<int:deck_id>')
 @login_required
+@reads_from_replica
 def view(deck_id):
     deck = Deck.query.get_or_404(deck_id)
-    
-    has_access = False
-    if deck.owner_id == current_user.id:
-        has_access = True
-    elif deck.visibility == 'class' and deck.class_id:
-        if any(m.class_id == deck.class_id for m in current_user.enrolled_classes):
-            has_access = True
             
-    if not has_access:
+    if not access.can_view(current_user, deck):
         flash('You do not have permission to view this deck.', 'error')
         return redirect(url_for('decks.list'))
 
-    return render_template('decks/view.html', deck=deck)
+    # Owners see edit controls, so the tag is per user
+    etag = deck_etag(deck, 'decks.view', current_user.id)
+    if not_modified(etag):
+        return not_modified_response(etag, deck.updated_at, PAGE_CACHE_CONTROL)
+
+    # Only the first page is rendered; the rest is fetched from decks.list_cards on demand
+    cards, next_after = card_page(deck)
+    total_cards = card_counts([deck.id])[deck.id] if next_after is not None else len(cards)
+
+    page = render_template('decks/view.html',
+                           deck=deck,
+                           cards=cards,
+                           total_cards=total_cards,
+                           next_page_url=_cards_page_url(deck.id, next_after))
+    return with_validators(page, etag, deck.updated_at, PAGE_CACHE_CONTROL)
+
+@bp.route('/<int:deck_id>/cards')
+@login_required
+@reads_from_replica
+def list_cards(deck_id):
+    deck = Deck.query.get_or_404(deck_id)
+    if not access.can_view(current_user, deck):
+        return jsonify({'error': 'You do not have permission to view this deck'}), 403
+
+    after = request.args.get('after', 0, type=int)
+    limit = request.args.get('limit', CARD_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_CARD_PAGE_SIZE))
+
+    etag = deck_etag(deck, 'decks.list_cards', after, limit)
+    if not_modified(etag, deck.updated_at):
+        return not_modified_response(etag, deck.updated_at, payload_cache_control())
+
+    cards, next_after = card_page(deck, after, limit)
+    return with_validators(jsonify({
+        'cards': cards,
+        'next': _cards_page_url(deck.id, next_after, limit)
+    }), etag, deck.updated_at, payload_cache_control())
 
 @bp.route('/<int:deck_id>/add', methods=['GET', 'POST'])
 @login_required
@@ -107,56 +155,17 @@ def add(deck_id):
         
     if request.method == 'POST':
         from app.models import Card
-        import json
-        
-        # Create a new card for this deck
-        card = Card(deck_id=deck.id, card_type=deck.question_type)
         
         try:
-            # Check what type of deck this is and save the correct fields
-            if deck.question_type == 'flashcard':
-                front = request.form.get('front')
-                back = request.form.get('back')
-                
-                # Check that both front and back text are provided
-                if not front or not back:
-                     raise ValueError("Front and Back text are required")
-                     
-                card.front_text = front
-                card.back_text = back
-                
-            elif deck.question_type == 'fill_gap':
-                sentence = request.form.get('sentence')
-                missing_word = request.form.get('missing_word')
-                
-                # Check that both sentence and missing word are provided
-                if not sentence or not missing_word:
-                    raise ValueError("Sentence and missing word are required")
-                
-                card.question_text = sentence
-                card.answers_json = json.dumps([missing_word])
-                
-            elif deck.question_type == 'mcq':
-                question = request.form.get('question')
-                opt1 = request.form.get('option_1')
-                opt2 = request.form.get('option_2')
-                opt3 = request.form.get('option_3')
-                opt4 = request.form.get('option_4')
-                correct_idx = request.form.get('correct_index')
-                explanation = request.form.get('explanation')
-                
-                # Check that all options and correct index are provided
-                if not question or not all([opt1, opt2, opt3, opt4]) or correct_idx is None:
-                    raise ValueError("All fields are required")
-                
-                card.question_text = question
-                card.options_json = json.dumps([opt1, opt2, opt3, opt4])
-                card.correct_index = int(correct_idx)
-                card.explanation_text = explanation
+            # Validate the fields for this deck's card type and create the card
+            card = Card(deck_id=deck.id, card_type=deck.question_type,
+                        **card_fields(deck.question_type, request.form))
             
             # Save the new card to the database
             db.session.add(card)
+            bump_content_version(deck)
             db.session.commit()
+            fragments.invalidate_deck(deck)
             flash('Card added successfully!', 'success')
             return redirect(url_for('decks.add', deck_id=deck.id))
             
@@ -166,6 +175,40 @@ def add(deck_id):
     
     return render_template('decks/add_card.html', deck=deck)
 
+@bp.route('/<int:deck_id>/import', methods=['POST'])
+@login_required
+def import_file(deck_id):
+    deck = Deck.query.get_or_404(deck_id)
+    
+    if deck.owner_id != current_user.id:
+        flash('You do not have permission to add cards to this deck.', 'error')
+        return redirect(url_for('decks.view', deck_id=deck.id))
+        
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('Please choose a CSV or JSON Lines file to import.', 'error')
+        return redirect(url_for('decks.add', deck_id=deck.id))
+        
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    if fmt not in IMPORT_FORMATS:
+        flash('Unsupported file type. Use .csv or .jsonl.', 'error')
+        return redirect(url_for('decks.add', deck_id=deck.id))
+        
+    try:
+        report = import_cards(deck, upload.stream, fmt)
+    except Exception as e:
+        flash(f'Error importing cards: {str(e)}', 'error')
+        return redirect(url_for('decks.add', deck_id=deck.id))
+    finally:
+        # Batches committed before a failure are kept
+        fragments.invalidate_deck(deck)
+        
+    flash(report.summary(), 'success' if report.imported else 'warning')
+    for error in report.errors:
+        flash(error, 'error')
+        
+    return redirect(url_for('decks.view', deck_id=deck.id))
+
 @bp.route('/<int:deck_id>/edit', methods=['POST'])
 @login_required
 def edit(deck_id):
@@ -178,6 +221,7 @@ def edit(deck_id):
     if new_title:
         deck.title = new_title
         db.session.commit()
+        fragments.invalidate_deck(deck)
         flash('Deck renamed successfully.', 'success')
         
     return redirect(url_for('decks.view', deck_id=deck.id))
@@ -190,9 +234,12 @@ def delete(deck_id):
         flash('You do not have permission to delete this deck.', 'error')
         return redirect(url_for('decks.view', deck_id=deck.id))
         
+    owner_id, class_id = deck.owner_id, deck.class_id
     try:
         db.session.delete(deck)
         db.session.commit()
+        forget_card_pages(deck_id)
+        fragments.invalidate(user_ids=[owner_id], class_ids=[class_id])
         flash('Deck deleted successfully.', 'success')
         return redirect(url_for('decks.list'))
     except Exception as e:
@@ -205,142 +252,64 @@ def delete(deck_id):
 def ai_generate(deck_id):
     from flask import current_app
     deck = Deck.query.get_or_404(deck_id)
-    
+
+    if deck.owner_id != current_user.id:
+        flash('You do not have permission to add cards to this deck.', 'error')
+        return redirect(url_for('decks.view', deck_id=deck.id))
+
     if deck.question_type != 'mcq':
         flash('AI Quiz Generation is only available for Multiple Choice Decks.', 'error')
         return redirect(url_for('decks.view', deck_id=deck.id))
         
     if request.method == 'POST':
-        import json
-        import os
-        from dotenv import load_dotenv
-        from app.models import Card
-        
-        load_dotenv()
-        api_key = os.getenv('GEMINI_API_KEY')
-        
-        if not api_key:
-            flash('AI configuration missing (GEMINI_API_KEY not found in env).', 'error')
-            return redirect(url_for('decks.view', deck_id=deck.id))
-            
         source_content = request.form.get('source_content')
-        num_questions = request.form.get('num_questions', 5)
+        num_questions = request.form.get('num_questions', 5, type=int)
         difficulty = request.form.get('difficulty', 'medium')
         
         if not source_content:
             flash('Source content is required.', 'error')
             return render_template('decks/ai_generator.html', deck=deck)
-            
+
         try:
-            from google import genai
-            
-            client = genai.Client(api_key=api_key)
-            
-            prompt = f"""
-            You are an educational AI. Generate {num_questions} multiple-choice questions (MCQ) based on the following content.
-            Difficulty Level: {difficulty}.
-            
-            Content:
-            {source_content}
-            
-            CRITICAL: Return the response STRICTLY as a raw JSON list of objects. 
-            Do NOT use markdown code blocks (no ```json). 
-            Do NOT include any preamble or postscript.
-            
-            Required Format:
-            [
-                {{
-                    "question": "The question text here?",
-                    "options": ["Option A", "Option B", "Option C", "Option D"],
-                    "answer": "The exact string of the correct option",
-                    "explanation": "Comprehensive explanation of why the correct answer is right and why the other options are wrong."
-                }}
-            ]
-            """
-            
-            import time
-            response = None
-            max_retries = 3
-            model_name = 'gemini-flash-latest'
-            
-            for attempt in range(max_retries):
-                try:
-                    response = client.models.generate_content(
-                        model=model_name, 
-                        contents=prompt
-                    )
-                    break 
-                except Exception as e:
-                    if '429' in str(e) and attempt < max_retries - 1:
-                        time.sleep(2 * (attempt + 1))
-                    else:
-                        raise e
-            
-            if not response or not response.text:
-                raise Exception("AI returned empty response.")
-            
-            
-            text_response = response.text.strip()
-            
-            import re
-            json_match = re.search(r'\[.*\]', text_response, re.DOTALL)
-            if json_match:
-                text_response = json_match.group(0)
-            else:
-                if text_response.startswith('```json'):
-                    text_response = text_response[7:]
-                if text_response.startswith('```'):
-                    text_response = text_response[3:]
-                if text_response.endswith('```'):
-                    text_response = text_response[:-3]
-            
-            try:
-                questions_data = json.loads(text_response.strip())
-            except json.JSONDecodeError as e:
-                raise e
-            
-            count = 0
-            for q in questions_data:
-                question_text = q.get('question')
-                options = q.get('options')
-                answer = q.get('answer')
-                
-                if not question_text or not options or not answer:
-                    continue
-                    
-                try:
-                    correct_index = options.index(answer)
-                except ValueError:
-                    continue
-                
-                # Create a new card with the generated properties
-                card = Card(
-                    deck_id=deck.id, 
-                    card_type='mcq',
-                    question_text=question_text,
-                    options_json=json.dumps(options),
-                    correct_index=correct_index,
-                    explanation_text=q.get('explanation', '')
-                )
-                db.session.add(card)
-                count += 1
-                
-            db.session.commit()
-            
-            if count == 0:
-                flash('AI generated response but 0 valid cards were created. Please check your source text.', 'warning')
-            else:
-                flash(f'Successfully generated {count} AI questions!', 'success')
-                
+            job = generation.submit_job(
+                current_app, deck, current_user.id, source_content, max(1, num_questions or 5), difficulty
+            )
+        except generation.GenerationError as e:
+            flash(str(e), 'error')
             return redirect(url_for('decks.view', deck_id=deck.id))
-            
-        except json.JSONDecodeError:
-            db.session.rollback()
-            flash('AI returned invalid data format. Please try again or simplify content.', 'error')
-            return render_template('decks/ai_generator.html', deck=deck, initial_content=source_content)
-        except Exception as e:
-            db.session.rollback()
-            flash(f'AI Error: {str(e)}', 'error')
-            return render_template('decks/ai_generator.html', deck=deck, initial_content=source_content)
 
-    return render_template('decks/ai_generator.html', deck=deck)
+        if job.status == 'done':
+            _flash_generation_result(job)
+            return redirect(url_for('decks.view', deck_id=deck.id))
+        return redirect(url_for('decks.ai_generate', deck_id=deck.id, job=job.id))
+
+    job = None
+    job_id = request.args.get('job', type=int)
+    if job_id:
+        job = GenerationJob.query.filter_by(id=job_id, deck_id=deck.id, user_id=current_user.id).first()
+
+    if job and job.status == 'failed':
+        return render_template('decks/ai_generator.html', deck=deck, initial_content=job.source_content)
+    return render_template('decks/ai_generator.html', deck=deck, job=job)
+
+def _flash_generation_result(job):
+    if job.cards_created == 0:
+        flash('AI generated response but 0 valid cards were created. Please check your source text.', 'warning')
+    else:
+        flash(f'Successfully generated {job.cards_created} AI questions!', 'success')
+
+@bp.route('/<int:deck_id>/ai-generate/jobs/<int:job_id>')
+@login_required
+def ai_generate_status(deck_id, job_id):
+    job = GenerationJob.query.filter_by(id=job_id, deck_id=deck_id).first_or_404()
+    if job.user_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+
+    data = job.to_dict()
+    if job.status == 'done':
+        _flash_generation_result(job)
+        data['redirect_url'] = url_for('decks.view', deck_id=deck_id)
+    elif job.status == 'failed':
+        flash(job.error, 'error')
+        data['redirect_url'] = url_for('decks.ai_generate', deck_id=deck_id, job=job.id)
+    return jsonify(data)
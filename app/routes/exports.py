@@ -0,0 +1,37 @@
+from flask import Blueprint, Response, abort, stream_with_context
+from flask_login import login_required, current_user
+from app.engine import reads_from_replica
+from app.models import Class
+from app.services.exporter import (
+    EXPORT_DATASETS, EXPORT_FORMATS, EXPORT_MIMETYPES,
+    class_export_query, stream_export, user_export_query
+)
+
+bp = Blueprint('exports', __name__, url_prefix='/export')
+
+def _streamed(query, fmt, filename):
+    # stream_with_context keeps the request (and its DB session) alive while the body is sent
+    response = Response(stream_with_context(stream_export(query, fmt)), mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def _check(dataset, fmt):
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        abort(404)
+
+@bp.route('/<dataset>.<fmt>')
+@login_required
+@reads_from_replica
+def mine(dataset, fmt):
+    _check(dataset, fmt)
+    return _streamed(user_export_query(dataset, current_user.id), fmt, f'{dataset}.{fmt}')
+
+@bp.route('/classes/<int:class_id>/<dataset>.<fmt>')
+@login_required
+@reads_from_replica
+def class_data(class_id, dataset, fmt):
+    _check(dataset, fmt)
+    class_obj = Class.query.get_or_404(class_id)
+    if class_obj.teacher_id != current_user.id:
+        abort(403)
+    return _streamed(class_export_query(dataset, class_id), fmt, f'class-{class_id}-{dataset}.{fmt}')
@@ -1,8 +1,12 @@
 from flask import Blueprint, render_template, redirect, url_for, request
 from flask_login import login_required, current_user
 from app import db
+from app.engine import reads_from_replica
 from app.models import Deck, CardProgress, Class
+from app.services.classes import member_counts
+from app.services.decks import card_counts
 from datetime import date, datetime
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('main', __name__)
 
@@ -12,16 +16,30 @@ def index():
         return redirect(url_for('main.dashboard'))
     return redirect(url_for('auth.login'))
 
+def _teacher_classes():
+    classes = Class.query.filter_by(teacher_id=current_user.id).all()
+    return {'classes': classes, 'member_counts': member_counts(c.id for c in classes)}
+
+def _student_lists():
+    decks = Deck.query.filter_by(owner_id=current_user.id).all()
+
+    enrolled_classes = []
+    if current_user.class_ids:
+        enrolled_classes = Class.query.options(joinedload(Class.teacher)).filter(
+            Class.id.in_(current_user.class_ids)
+        ).order_by(Class.name).all()
+
+    return {'decks': decks,
+            'card_counts': card_counts(deck.id for deck in decks),
+            'enrolled_classes': enrolled_classes}
+
 @bp.route('/dashboard')
 @login_required
+@reads_from_replica
 def dashboard():
+    # The class and deck lists are loaded from the templates' cached fragments
     if current_user.role == 'teacher':
-        classes = Class.query.filter_by(teacher_id=current_user.id).all()
-        
-        return render_template('dashboard/teacher.html',
-                               classes=classes)
-    
-    decks = Deck.query.filter_by(owner_id=current_user.id).all()
+        return render_template('dashboard/teacher.html', load_classes=_teacher_classes)
     
     today = date.today()
     cards_due_count = CardProgress.query.filter(
@@ -36,19 +54,17 @@ def dashboard():
         'study_minutes': 32
     }
     
-    enrolled_classes = current_user.enrolled_classes
-    
     return render_template('dashboard/student.html', 
-                           decks=decks, 
                            cards_due_count=cards_due_count,
                            stats=stats,
-                           enrolled_classes=enrolled_classes)
+                           load_lists=_student_lists)
 
 @bp.route('/stats')
 @login_required
+@reads_from_replica
 def stats():
-    from app.models import StudyResult
-    from sqlalchemy import func, and_
+    from app.models import StudyDailyRollup
+    from sqlalchemy import func, extract
     import calendar
 
     start_str = request.args.get('start_date')
@@ -75,49 +91,36 @@ def stats():
         end_date = today
 
     
-    base_query = StudyResult.query.filter(
-        StudyResult.user_id == current_user.id,
-        StudyResult.completed_at >= start_date,
-        StudyResult.completed_at <= datetime.combine(end_date, datetime.max.time()),
-        StudyResult.question_type.in_(['mcq', 'fill_gap']) 
-    )
+    # Read the daily rollup (at most one row per day and type) grouped by month
+    year_col = extract('year', StudyDailyRollup.day)
+    month_col = extract('month', StudyDailyRollup.day)
+    monthly_rows = db.session.query(
+        year_col.label('year'),
+        month_col.label('month'),
+        func.sum(StudyDailyRollup.attempts).label('attempts'),
+        func.sum(StudyDailyRollup.passes).label('passes')
+    ).filter(
+        StudyDailyRollup.user_id == current_user.id,
+        StudyDailyRollup.day >= start_date,
+        StudyDailyRollup.day <= end_date,
+        StudyDailyRollup.question_type.in_(['mcq', 'fill_gap'])
+    ).group_by(year_col, month_col).all()
 
-    results = base_query.all()
-    
-    attempted_questions = len(results)
-    
-    
-    total_points = 0
-    for r in results:
-        if r.max_score > 0 and (r.score / r.max_score) >= 0.5:
-            total_points += 1
+    by_month = {(int(row.year), int(row.month)): (int(row.attempts), int(row.passes)) for row in monthly_rows}
+
+    attempted_questions = sum(attempts for attempts, _ in by_month.values())
+    total_points = sum(passes for _, passes in by_month.values())
             
     accuracy = 0
     if attempted_questions > 0:
         accuracy = int((total_points / attempted_questions) * 100)
     
-    
-    monthly_data = []
-    
     current_m = start_date.replace(day=1)
     month_labels = []
     monthly_accuracy = []
     
     while current_m <= end_date:
-        last_day = calendar.monthrange(current_m.year, current_m.month)[1]
-        m_end = current_m.replace(day=last_day)
-        
-        # Filter results that fall within the current month
-        m_results = []
-        for r in results:
-            if r.completed_at.date() >= current_m and r.completed_at.date() <= m_end:
-                m_results.append(r)
-        
-        m_attempts = len(m_results)
-        m_points = 0
-        for r in m_results:
-             if r.max_score > 0 and (r.score / r.max_score) >= 0.5:
-                m_points += 1
+        m_attempts, m_points = by_month.get((current_m.year, current_m.month), (0, 0))
         
         if m_attempts > 0:
             m_acc = int((m_points / m_attempts) * 100)
@@ -1,92 +1,119 @@
-from flask import Blueprint, render_template, redirect, url_for, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, request, jsonify, current_app
 from flask_login import login_required, current_user
 from app import db
+from app.http_cache import (PAGE_CACHE_CONTROL, deck_etag, not_modified, not_modified_response,
+                            payload_cache_control, with_validators)
 from app.models import Deck, StudyResult
-from datetime import datetime
+from app.services import access, progress as progress_service, rollup, scheduler
+from app.services.decks import card_counts, card_page, due_session_payload, CARD_PAGE_SIZE
+from app.services.review import review_page
+from jinja2.utils import htmlsafe_json_dumps
+from datetime import datetime, date, timedelta
 import json
 
 bp = Blueprint('study', __name__, url_prefix='/study')
 
+# Upper bound on how many queued answers the session page may flush at once
+MAX_BATCH_REVIEWS = 500
+# Upper bound for the per-session caps that can be requested in due mode
+MAX_SESSION_CARDS = 500
+# Cards sent per page in the cross-deck review session
+REVIEW_PAGE_SIZE = 50
+# Oldest answered_at accepted from queued reviews, relative to the server's today
+MAX_ANSWER_AGE_DAYS = 1
+
 @bp.route('/session/<int:deck_id>')
 @login_required
 def session(deck_id):
     deck = Deck.query.get_or_404(deck_id)
-    
-    has_access = False
-    if deck.owner_id == current_user.id:
-        has_access = True
-    elif deck.visibility == 'class' and deck.class_id:
-        # Check if the student is in the class this deck belongs to
-        for member in current_user.enrolled_classes:
-            if member.class_id == deck.class_id:
-                has_access = True
-                break
             
-    if not has_access:
+    if not access.can_view(current_user, deck):
         return redirect(url_for('decks.list'))
 
-    cards_data = []
-    
-    cards_list = deck.cards.all()
-    
-    if not cards_list:
-        return render_template('study/session.html', deck=deck, cards_json='[]')
+    mode = request.args.get('mode', 'all')
+    if mode == 'due':
+        # Only the cards scheduled for today plus a capped number of new ones
+        new_limit = _session_limit('new', current_app.config['STUDY_NEW_CARD_LIMIT'])
+        review_limit = _session_limit('reviews', current_app.config['STUDY_REVIEW_CARD_LIMIT'])
+        cards_json = due_session_payload(deck, current_user.id, new_limit, review_limit)
+        return render_template('study/session.html', deck=deck, cards_json=cards_json, mode=mode)
 
-    for card in cards_list:
-        try:
-            # Create a dictionary to hold the card's data for the frontend
-            card_obj = {
-                'id': card.id,
-                'type': str(card.card_type)
-            }
-            
-            # Add fields based on the type of card
-            if card.card_type == 'flashcard':
-                card_obj['front'] = str(card.front_text or '')
-                card_obj['back'] = str(card.back_text or '')
-
-            elif card.card_type == 'fill_gap':
-                card_obj['sentence'] = str(card.question_text or '')
-                
-                # Get the answers from the database safely
-                try:
-                    # In python, card.answers returns a list if answers_json is valid
-                    raw_answers = card.answers
-                    
-                    # Ensure all answers are converted to strings
-                    string_answers = []
-                    if isinstance(raw_answers, list):
-                        for a in raw_answers:
-                            string_answers.append(str(a))
-                    card_obj['answers'] = string_answers
-                except Exception:
-                    card_obj['answers'] = []
-
-            elif card.card_type == 'mcq':
-                card_obj['question'] = str(card.question_text or '')
-                
-                # Get options from the database safely
-                try:
-                    raw_options = card.options
-                    
-                    # Convert all options to strings
-                    string_options = []
-                    if isinstance(raw_options, list):
-                        for o in raw_options:
-                            string_options.append(str(o))
-                    card_obj['options'] = string_options
-                except Exception:
-                    card_obj['options'] = []
-                    
-                card_obj['correct_index'] = int(card.correct_index) if card.correct_index is not None else 0
-                card_obj['explanation'] = str(card.explanation_text or 'None')
-                
-            # Add the mapped card object to our final list mapping
-            cards_data.append(card_obj)
-        except Exception as e:
-            continue
-        
-    return render_template('study/session.html', deck=deck, cards_data=cards_data)
+    # The whole-deck session is the same page for every user who can see the deck
+    etag = deck_etag(deck, 'study.session')
+    if not_modified(etag):
+        return not_modified_response(etag, deck.updated_at, PAGE_CACHE_CONTROL)
+
+    cards_data, next_page_url, total_cards = _session_cards(deck)
+    page = render_template('study/session.html',
+                           deck=deck,
+                           mode='all',
+                           cards_json=htmlsafe_json_dumps(cards_data),
+                           next_page_url=next_page_url,
+                           total_cards=total_cards)
+    return with_validators(page, etag, deck.updated_at, PAGE_CACHE_CONTROL)
+
+@bp.route('/session/<int:deck_id>.json')
+@login_required
+def session_payload(deck_id):
+    deck = Deck.query.get_or_404(deck_id)
+    if not access.can_view(current_user, deck):
+        return jsonify({'error': 'You do not have access to this deck'}), 403
+
+    etag = deck_etag(deck, 'study.session_payload')
+    if not_modified(etag, deck.updated_at):
+        return not_modified_response(etag, deck.updated_at, payload_cache_control())
+
+    cards_data, next_page_url, total_cards = _session_cards(deck)
+    payload = jsonify({
+        'deck': {'id': deck.id, 'title': deck.title, 'question_type': deck.question_type},
+        'cards': cards_data,
+        'next': next_page_url,
+        'total': total_cards
+    })
+    return with_validators(payload, etag, deck.updated_at, payload_cache_control())
+
+def _session_cards(deck):
+    """First card page of a whole-deck session, the URL of the next one and the card total."""
+    # First page only; the page streams the rest from decks.list_cards.
+    # Pages are cached per deck content version and shared across users.
+    cards_data, next_after = card_page(deck)
+    next_page_url = None
+    total_cards = len(cards_data)
+    if next_after is not None:
+        next_page_url = url_for('decks.list_cards', deck_id=deck.id, after=next_after, limit=CARD_PAGE_SIZE)
+        total_cards = card_counts([deck.id])[deck.id]
+    return cards_data, next_page_url, total_cards
+
+@bp.route('/review')
+@login_required
+def review():
+    # Everything due across the user's own and class decks, most urgent first
+    cards_data, next_cursor, total_due = review_page(current_user.id, REVIEW_PAGE_SIZE)
+
+    return render_template('study/session.html',
+                           deck=None,
+                           mode='review',
+                           cards_json=htmlsafe_json_dumps(cards_data),
+                           next_page_url=_review_page_url(next_cursor, REVIEW_PAGE_SIZE),
+                           total_cards=total_due)
+
+@bp.route('/review/cards')
+@login_required
+def review_cards():
+    limit = request.args.get('limit', REVIEW_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_SESSION_CARDS))
+    cards_data, next_cursor, total_due = review_page(current_user.id, limit, request.args.get('after'))
+
+    return jsonify({
+        'cards': cards_data,
+        'next': _review_page_url(next_cursor, limit),
+        'total': total_due
+    })
+
+def _review_page_url(cursor, limit):
+    if cursor is None:
+        return None
+    return url_for('study.review_cards', after=cursor, limit=limit)
 
 @bp.route('/save_result', methods=['POST'])
 @login_required
@@ -94,6 +121,9 @@ def save_result():
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No data provided'}), 400
+
+    if not access.can_access(current_user, [data.get('deck_id')]):
+        return jsonify({'error': 'You do not have access to this deck'}), 403
         
     try:
         result = StudyResult(
@@ -105,7 +135,9 @@ def save_result():
             completed_at=datetime.utcnow()
         )
         db.session.add(result)
+        rollup.record_result(result)
         db.session.commit()
+        progress_service.invalidate_for_deck(result.deck_id)
         return jsonify({'success': True})
     except Exception as e:
         db.session.rollback()
@@ -124,39 +156,113 @@ def save_progress():
     if card_id is None or quality is None:
          return jsonify({'error': 'Missing card_id or quality'}), 400
 
+    if not access.accessible_card_ids(current_user, [card_id]):
+        return jsonify({'error': 'You do not have access to this card'}), 403
+
     try:
-        from app.models import CardProgress, Card
-        from datetime import timedelta, date
-        
+        from app.models import CardProgress
+        from datetime import date
+
         progress = CardProgress.query.get((current_user.id, card_id))
         if not progress:
             progress = CardProgress(user_id=current_user.id, card_id=card_id)
             db.session.add(progress)
-            
-        
-        if quality < 3:
-            progress.repetitions = 0
-            progress.interval_days = 1
-        else:
-            if progress.repetitions == 0:
-                progress.interval_days = 1
-            elif progress.repetitions == 1:
-                progress.interval_days = 6
-            else:
-                progress.interval_days = int(progress.interval_days * float(progress.ease_factor))
-            
-            progress.repetitions += 1
-            
-        new_ef = float(progress.ease_factor) + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-        if new_ef < 1.3:
-            new_ef = 1.3
-        progress.ease_factor = new_ef
-        
-        progress.next_review_date = date.today() + timedelta(days=progress.interval_days)
-        
+
+        _apply_sm2(progress, quality, date.today())
+
         db.session.commit()
+        progress_service.invalidate_for_cards([card_id])
         return jsonify({'success': True, 'next_review': progress.next_review_date.isoformat()})
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@bp.route('/save_progress_batch', methods=['POST'])
+@login_required
+def save_progress_batch():
+    # Apply a queue of answers in one transaction instead of one request per card.
+    # Reviews are applied in the order given, so the same card may appear more than once.
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('reviews'), list):
+        return jsonify({'error': 'No reviews provided'}), 400
+
+    reviews = data['reviews']
+    if len(reviews) > MAX_BATCH_REVIEWS:
+        return jsonify({'error': f'At most {MAX_BATCH_REVIEWS} reviews per batch'}), 400
+
+    parsed = []
+    for review in reviews:
+        try:
+            card_id = int(review['card_id'])
+            quality = int(review['quality'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Each review needs a card_id and quality'}), 400
+        if quality < 0 or quality > scheduler.MAX_QUALITY:
+            return jsonify({'error': f'Quality must be between 0 and {scheduler.MAX_QUALITY}'}), 400
+        parsed.append((card_id, quality, _parse_answered_at(review.get('answered_at'))))
+
+    # Cards the user may not see, or that were deleted since the session loaded, are
+    # skipped and reported back instead of failing the rest of the batch
+    card_ids = access.accessible_card_ids(current_user, {card_id for card_id, _, _ in parsed})
+    rejected = sorted({card_id for card_id, _, _ in parsed} - card_ids)
+    parsed = [review for review in parsed if review[0] in card_ids]
+
+    if not parsed:
+        return jsonify({'success': True, 'saved': 0, 'next_reviews': {}, 'rejected': rejected})
+
+    try:
+        from app.models import CardProgress
+
+        existing = CardProgress.query.filter(
+            CardProgress.user_id == current_user.id,
+            CardProgress.card_id.in_(card_ids)
+        ).all()
+        progress_by_card = {p.card_id: p for p in existing}
+
+        for card_id, quality, answered_on in parsed:
+            progress = progress_by_card.get(card_id)
+            if progress is None:
+                progress = CardProgress(user_id=current_user.id, card_id=card_id)
+                db.session.add(progress)
+                progress_by_card[card_id] = progress
+            _apply_sm2(progress, quality, answered_on)
+
+        db.session.commit()
+        progress_service.invalidate_for_cards(card_ids)
+
+        next_reviews = {
+            str(card_id): progress_by_card[card_id].next_review_date.isoformat()
+            for card_id in card_ids
+        }
+        return jsonify({'success': True, 'saved': len(parsed), 'next_reviews': next_reviews, 'rejected': rejected})
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _session_limit(name, default):
+    # Allow ?new=/?reviews= to lower or raise a cap, within a sane range
+    value = request.args.get(name, type=int)
+    if value is None:
+        return default
+    return max(0, min(value, MAX_SESSION_CARDS))
+
+def _parse_answered_at(value):
+    # The session page sends ISO timestamps; fall back to today when missing or malformed.
+    # Clamped to the last day so a client cannot back- or future-date its schedule.
+    today = date.today()
+    if value:
+        try:
+            answered_on = datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
+        except ValueError:
+            return today
+        return max(today - timedelta(days=MAX_ANSWER_AGE_DAYS), min(answered_on, today))
+    return today
+
+def _apply_sm2(progress, quality, review_date):
+    state = scheduler.review(progress.ease_factor, progress.interval_days, progress.repetitions, quality)
+    progress.ease_factor = state.ease_factor
+    progress.interval_days = state.interval_days
+    progress.repetitions = state.repetitions
+    progress.next_review_date = scheduler.next_review_date(review_date, state.interval_days)
@@ -0,0 +1,69 @@
+"""Which classes and decks a user may see.
+
+A user's enrolled class ids are read with one query and cached per user for
+``ACCESS_CACHE_TTL`` seconds, so deck checks never walk the ``enrolled_classes``
+backref. Membership changes call ``forget`` through the mapper events in
+``app.services.users``; other workers pick the change up when their entry
+expires.
+"""
+from sqlalchemy import and_, false, or_
+
+from app import db
+from app.models import Card, ClassMember, Deck
+from app.services.cache import TTLCache
+
+ACCESS_CACHE_TTL = 30
+
+_class_ids_cache = TTLCache(maxsize=4096, ttl=ACCESS_CACHE_TTL)
+
+
+def class_ids(user_id):
+    """Return the frozenset of class ids ``user_id`` is enrolled in."""
+    ids = _class_ids_cache.get(user_id)
+    if ids is None:
+        ids = frozenset(db.session.scalars(
+            db.select(ClassMember.class_id).where(ClassMember.student_id == user_id)
+        ))
+        _class_ids_cache.set(user_id, ids)
+    return ids
+
+
+def forget(user_ids):
+    for user_id in user_ids:
+        _class_ids_cache.pop(user_id)
+
+
+def accessible_decks_clause(user_id):
+    """SQL condition matching decks ``user_id`` owns or sees through a class."""
+    enrolled = class_ids(user_id)
+    shared = and_(Deck.visibility == 'class', Deck.class_id.in_(enrolled)) if enrolled else false()
+    return or_(Deck.owner_id == user_id, shared)
+
+
+def can_view(user, deck):
+    """Check access to an already loaded ``deck`` without querying decks again."""
+    if deck.owner_id == user.id:
+        return True
+    return deck.visibility == 'class' and deck.class_id in user.class_ids
+
+
+def can_access(user, deck_ids):
+    """Return the subset of ``deck_ids`` that ``user`` may see, using one query."""
+    deck_ids = set(deck_ids)
+    if not deck_ids:
+        return set()
+    return set(db.session.scalars(
+        db.select(Deck.id).where(Deck.id.in_(deck_ids), accessible_decks_clause(user.id))
+    ))
+
+
+def accessible_card_ids(user, card_ids):
+    """Return the subset of ``card_ids`` in decks ``user`` may see, using one query."""
+    card_ids = set(card_ids)
+    if not card_ids:
+        return set()
+    return set(db.session.scalars(
+        db.select(Card.id).join(Deck, Deck.id == Card.deck_id).where(
+            Card.id.in_(card_ids), accessible_decks_clause(user.id)
+        )
+    ))
@@ -0,0 +1,55 @@
+"""Card validation shared by the add-card form and bulk imports."""
+import json
+
+# Input fields accepted for each card type, as named in the add-card form
+CARD_FIELDS = {
+    'flashcard': ('front', 'back'),
+    'fill_gap': ('sentence', 'missing_word'),
+    'mcq': ('question', 'option_1', 'option_2', 'option_3', 'option_4', 'correct_index', 'explanation'),
+}
+
+
+def card_fields(card_type, data):
+    """Validate add-card input and return the ``Card`` column values for it.
+
+    ``data`` is any mapping using the add-card form field names (a request
+    form, a CSV row or a JSON object). Raises ``ValueError`` when required
+    fields are missing.
+    """
+    if card_type == 'flashcard':
+        front = data.get('front')
+        back = data.get('back')
+
+        # Check that both front and back text are provided
+        if not front or not back:
+            raise ValueError("Front and Back text are required")
+
+        return {'front_text': front, 'back_text': back}
+
+    elif card_type == 'fill_gap':
+        sentence = data.get('sentence')
+        missing_word = data.get('missing_word')
+
+        # Check that both sentence and missing word are provided
+        if not sentence or not missing_word:
+            raise ValueError("Sentence and missing word are required")
+
+        return {'question_text': sentence, 'answers_json': json.dumps([missing_word])}
+
+    elif card_type == 'mcq':
+        question = data.get('question')
+        options = [data.get(f'option_{i}') for i in range(1, 5)]
+        correct_idx = data.get('correct_index')
+
+        # Check that all options and correct index are provided
+        if not question or not all(options) or correct_idx is None:
+            raise ValueError("All fields are required")
+
+        return {
+            'question_text': question,
+            'options_json': json.dumps(options),
+            'correct_index': int(correct_idx),
+            'explanation_text': data.get('explanation'),
+        }
+
+    raise ValueError(f"Unknown card type: {card_type}")
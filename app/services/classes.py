@@ -0,0 +1,20 @@
+"""Class queries shared by the dashboards."""
+from sqlalchemy import func
+
+from app import db
+from app.models import ClassMember
+
+
+def member_counts(class_ids):
+    """Return ``{class_id: number of students}`` using one grouped query."""
+    class_ids = {class_id for class_id in class_ids if class_id is not None}
+    if not class_ids:
+        return {}
+
+    rows = db.session.query(ClassMember.class_id, func.count(ClassMember.student_id)).filter(
+        ClassMember.class_id.in_(class_ids)
+    ).group_by(ClassMember.class_id).all()
+
+    counts = dict.fromkeys(class_ids, 0)
+    counts.update(rows)
+    return counts
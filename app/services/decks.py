@@ -0,0 +1,164 @@
+"""Deck queries and study payloads shared by the deck and study pages."""
+from datetime import date
+
+from jinja2.utils import htmlsafe_json_dumps
+from sqlalchemy import and_, func
+
+from app import db
+from app.models import Card, CardProgress, Deck
+from app.services.cache import TTLCache
+
+# Cards per page for the deck view, study sessions and the card API
+CARD_PAGE_SIZE = 50
+
+# Serialized card pages keyed by (deck_id, content_version, updated_at, after,
+# limit). SQLite reuses a deleted deck's id and every deck starts at version 0,
+# so updated_at tells a new deck from the old one. Old versions are never read
+# again and age out through the LRU.
+_payload_cache = TTLCache(maxsize=2048, ttl=3600)
+
+
+def card_counts(deck_ids):
+    """Return ``{deck_id: card count}`` for ``deck_ids`` using one grouped query.
+
+    Decks without cards are included with a count of 0.
+    """
+    deck_ids = {deck_id for deck_id in deck_ids if deck_id is not None}
+    if not deck_ids:
+        return {}
+
+    rows = db.session.query(Card.deck_id, func.count(Card.id)).filter(
+        Card.deck_id.in_(deck_ids)
+    ).group_by(Card.deck_id).all()
+
+    counts = dict.fromkeys(deck_ids, 0)
+    counts.update(rows)
+    return counts
+
+
+def bump_content_version(deck):
+    """Mark ``deck``'s cards as changed so cached payloads are rebuilt.
+
+    Done as a SQL increment so concurrent edits cannot lose a bump. Takes
+    effect when the caller commits.
+    """
+    deck.content_version = Deck.content_version + 1
+
+
+def forget_card_pages(deck_id):
+    """Drop the cached card pages of ``deck_id``, e.g. once the deck is deleted."""
+    _payload_cache.pop_where(lambda key: key[0] == deck_id)
+
+
+def serialize_card(card):
+    """Return the dict the study session page expects for ``card``."""
+    # Create a dictionary to hold the card's data for the frontend
+    card_obj = {
+        'id': card.id,
+        'deck_id': card.deck_id,
+        'type': str(card.card_type)
+    }
+
+    # Add fields based on the type of card
+    if card.card_type == 'flashcard':
+        card_obj['front'] = str(card.front_text or '')
+        card_obj['back'] = str(card.back_text or '')
+
+    elif card.card_type == 'fill_gap':
+        card_obj['sentence'] = str(card.question_text or '')
+
+        # Get the answers from the database safely
+        try:
+            raw_answers = card.answers
+            card_obj['answers'] = [str(a) for a in raw_answers] if isinstance(raw_answers, list) else []
+        except Exception:
+            card_obj['answers'] = []
+
+    elif card.card_type == 'mcq':
+        card_obj['question'] = str(card.question_text or '')
+
+        # Get options from the database safely
+        try:
+            raw_options = card.options
+            card_obj['options'] = [str(o) for o in raw_options] if isinstance(raw_options, list) else []
+        except Exception:
+            card_obj['options'] = []
+
+        card_obj['correct_index'] = int(card.correct_index) if card.correct_index is not None else 0
+        card_obj['explanation'] = str(card.explanation_text or 'None')
+
+    return card_obj
+
+
+def card_page(deck, after=None, limit=CARD_PAGE_SIZE):
+    """Return ``(cards_data, next_after)`` for one keyset page of ``deck``'s cards.
+
+    Cards are ordered by id and ``after`` is the last card id of the previous
+    page. ``next_after`` is None on the last page. Pages are cached per deck
+    content version and shared by every user who opens the deck, so repeat
+    loads skip the card query and serialization.
+    """
+    after = after or 0
+    key = (deck.id, deck.content_version, deck.updated_at, after, limit)
+    page = _payload_cache.get(key)
+    if page is not None:
+        return page
+
+    # One extra row tells us whether another page follows
+    cards = Card.query.filter(
+        Card.deck_id == deck.id,
+        Card.id > after
+    ).order_by(Card.id).limit(limit + 1).all()
+
+    has_more = len(cards) > limit
+    cards = cards[:limit]
+
+    cards_data = []
+    for card in cards:
+        try:
+            cards_data.append(serialize_card(card))
+        except Exception:
+            continue
+
+    page = (cards_data, cards[-1].id if has_more else None)
+    _payload_cache.set(key, page)
+    return page
+
+
+def due_session_payload(deck, user_id, new_limit, review_limit, today=None):
+    """Return HTML-safe JSON for a due-only session of ``deck`` for ``user_id``.
+
+    Contains up to ``review_limit`` cards whose review date has passed, most
+    overdue first, followed by up to ``new_limit`` cards the user has never
+    studied. Only the selected cards are loaded, so the payload follows the
+    day's workload rather than the deck size.
+    """
+    today = today or date.today()
+
+    reviews = []
+    if review_limit > 0:
+        reviews = Card.query.join(
+            CardProgress,
+            and_(CardProgress.card_id == Card.id, CardProgress.user_id == user_id)
+        ).filter(
+            Card.deck_id == deck.id,
+            CardProgress.next_review_date <= today
+        ).order_by(CardProgress.next_review_date, Card.id).limit(review_limit).all()
+
+    new_cards = []
+    if new_limit > 0:
+        new_cards = Card.query.outerjoin(
+            CardProgress,
+            and_(CardProgress.card_id == Card.id, CardProgress.user_id == user_id)
+        ).filter(
+            Card.deck_id == deck.id,
+            CardProgress.card_id.is_(None)
+        ).order_by(Card.id).limit(new_limit).all()
+
+    cards_data = []
+    for card in reviews + new_cards:
+        try:
+            cards_data.append(serialize_card(card))
+        except Exception:
+            continue
+    return htmlsafe_json_dumps(cards_data)
@@ -0,0 +1,109 @@
+"""Streaming CSV / JSON Lines export of decks, cards, progress and results.
+
+Rows are read with ``yield_per`` (a server-side cursor where the driver
+supports one) and encoded in chunks, so an export never holds the full
+result set in memory.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from app import db
+from app.models import Card, CardProgress, ClassMember, Deck, StudyResult
+
+EXPORT_DATASETS = ('decks', 'cards', 'progress', 'results')
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_MIMETYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+# Rows fetched from the database and encoded per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+_COLUMNS = {
+    'decks': (Deck.id, Deck.owner_id, Deck.title, Deck.description, Deck.visibility,
+              Deck.question_type, Deck.class_id, Deck.created_at),
+    'cards': (Card.id, Card.deck_id, Card.card_type, Card.front_text, Card.back_text,
+              Card.question_text, Card.answers_json, Card.options_json, Card.correct_index,
+              Card.explanation_text, Card.created_at),
+    'progress': (CardProgress.user_id, CardProgress.card_id, Card.deck_id, CardProgress.next_review_date,
+                 CardProgress.ease_factor, CardProgress.interval_days, CardProgress.repetitions),
+    'results': (StudyResult.id, StudyResult.user_id, StudyResult.deck_id, StudyResult.score,
+                StudyResult.max_score, StudyResult.question_type, StudyResult.completed_at),
+}
+
+
+def user_export_query(dataset, user_id):
+    """Select for ``dataset`` covering what ``user_id`` owns or has studied."""
+    columns = _COLUMNS[dataset]
+    if dataset == 'decks':
+        return db.select(*columns).where(Deck.owner_id == user_id).order_by(Deck.id)
+    if dataset == 'cards':
+        return db.select(*columns).join(Deck, Deck.id == Card.deck_id).where(
+            Deck.owner_id == user_id
+        ).order_by(Card.id)
+    if dataset == 'progress':
+        return db.select(*columns).join(Card, Card.id == CardProgress.card_id).where(
+            CardProgress.user_id == user_id
+        ).order_by(CardProgress.card_id)
+    return db.select(*columns).where(StudyResult.user_id == user_id).order_by(StudyResult.id)
+
+
+def class_export_query(dataset, class_id):
+    """Select for ``dataset`` covering a class's decks and its members' history on them."""
+    columns = _COLUMNS[dataset]
+    member_ids = db.select(ClassMember.student_id).where(ClassMember.class_id == class_id)
+    if dataset == 'decks':
+        return db.select(*columns).where(Deck.class_id == class_id).order_by(Deck.id)
+    if dataset == 'cards':
+        return db.select(*columns).join(Deck, Deck.id == Card.deck_id).where(
+            Deck.class_id == class_id
+        ).order_by(Card.id)
+    if dataset == 'progress':
+        return db.select(*columns).join(Card, Card.id == CardProgress.card_id).join(
+            Deck, Deck.id == Card.deck_id
+        ).where(
+            Deck.class_id == class_id,
+            CardProgress.user_id.in_(member_ids)
+        ).order_by(CardProgress.user_id, CardProgress.card_id)
+    return db.select(*columns).join(Deck, Deck.id == StudyResult.deck_id).where(
+        Deck.class_id == class_id,
+        StudyResult.user_id.in_(member_ids)
+    ).order_by(StudyResult.id)
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def stream_export(query, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the rows of ``query`` encoded as ``fmt``, one chunk of rows at a time."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    result = db.session.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+    keys = list(result.keys())
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(keys)
+
+    for partition in result.partitions():
+        for row in partition:
+            values = [_plain(value) for value in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(keys, values))))
+                buffer.write('\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header-only CSV for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
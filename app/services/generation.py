@@ -0,0 +1,388 @@
+"""Background AI quiz generation.
+
+Requests are stored as ``generation_jobs`` rows and executed by a small
+per-app thread pool, so the web request only records the job and returns.
+Long source texts are split into chunks that are sent to the model
+concurrently (at most ``AI_MAX_PARALLEL_CHUNKS`` at a time) and the parsed
+questions are inserted into the deck as MCQ cards.
+
+The model client is pluggable: anything with a ``model_name`` attribute and a
+``generate(prompt) -> str`` method works. ``FakeClient`` answers offline and
+is selected with ``AI_MODEL_CLIENT=fake``.
+"""
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db, fragments
+from app.models import Card, GenerationJob
+from app.services import question_cache
+from app.services.decks import bump_content_version
+
+DEFAULT_MODEL_NAME = 'gemini-flash-latest'
+MAX_RETRIES = 3
+
+PROMPT_TEMPLATE = """
+You are an educational AI. Generate {num_questions} multiple-choice questions (MCQ) based on the following content.
+Difficulty Level: {difficulty}.
+
+Content:
+{content}
+
+CRITICAL: Return the response STRICTLY as a raw JSON list of objects.
+Do NOT use markdown code blocks (no ```json).
+Do NOT include any preamble or postscript.
+
+Required Format:
+[
+    {{
+        "question": "The question text here?",
+        "options": ["Option A", "Option B", "Option C", "Option D"],
+        "answer": "The exact string of the correct option",
+        "explanation": "Comprehensive explanation of why the correct answer is right and why the other options are wrong."
+    }}
+]
+"""
+
+
+class GenerationError(Exception):
+    pass
+
+
+class GeminiClient:
+    def __init__(self, api_key, model_name=DEFAULT_MODEL_NAME, max_retries=MAX_RETRIES):
+        from google import genai
+
+        self._client = genai.Client(api_key=api_key)
+        self.model_name = model_name
+        self.max_retries = max_retries
+
+    def generate(self, prompt):
+        response = None
+        for attempt in range(self.max_retries):
+            try:
+                response = self._client.models.generate_content(model=self.model_name, contents=prompt)
+                break
+            except Exception as e:
+                if '429' in str(e) and attempt < self.max_retries - 1:
+                    time.sleep(2 * (attempt + 1))
+                else:
+                    raise
+
+        if not response or not response.text:
+            raise GenerationError("AI returned empty response.")
+        return response.text
+
+
+class FakeClient:
+    """Offline client that builds well-formed questions from the prompt's own words."""
+
+    model_name = 'fake'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+
+        count = int(re.search(r'Generate (\d+) multiple-choice', prompt).group(1))
+        content = prompt.split('Content:', 1)[1].split('CRITICAL:', 1)[0]
+        words = re.findall(r'\w{4,}', content) or ['content']
+
+        questions = []
+        for i in range(count):
+            word = words[i % len(words)]
+            questions.append({
+                'question': f'Which of these words appears in the source text? ({i + 1})',
+                'options': [word, f'{word}-{i}a', f'{word}-{i}b', f'{word}-{i}c'],
+                'answer': word,
+                'explanation': f'"{word}" is taken from the source text.',
+            })
+        return json.dumps(questions)
+
+
+def make_client(config):
+    """Build the model client selected by ``AI_MODEL_CLIENT``."""
+    if config['AI_MODEL_CLIENT'] == 'fake':
+        return FakeClient(latency=config.get('AI_FAKE_LATENCY', 0.0))
+
+    api_key = config.get('GEMINI_API_KEY')
+    if not api_key:
+        raise GenerationError('AI configuration missing (GEMINI_API_KEY not found in env).')
+    return GeminiClient(api_key, model_name=config['AI_MODEL_NAME'])
+
+
+def build_prompt(content, num_questions, difficulty):
+    return PROMPT_TEMPLATE.format(content=content, num_questions=num_questions, difficulty=difficulty)
+
+
+def chunk_text(text, max_chars):
+    """Split ``text`` into chunks of at most ``max_chars``, on paragraph and
+    then sentence boundaries where possible."""
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+            while len(sentence) > max_chars:
+                pieces.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if sentence:
+                pieces.append(sentence)
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + 2 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f'{current}\n\n{piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def allocate_questions(chunks, total):
+    """Split ``total`` questions across ``chunks`` in proportion to their length."""
+    lengths = [len(chunk) for chunk in chunks]
+    size = sum(lengths)
+    if not size:
+        return [0] * len(chunks)
+
+    shares = [total * length / size for length in lengths]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(chunks)), key=lambda i: shares[i] - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def parse_questions(text):
+    """Extract the JSON question list from a model response.
+
+    Raises ``json.JSONDecodeError`` if no valid list can be found.
+    """
+    text = text.strip()
+    json_match = re.search(r'\[.*\]', text, re.DOTALL)
+    if json_match:
+        text = json_match.group(0)
+    else:
+        if text.startswith('```json'):
+            text = text[7:]
+        if text.startswith('```'):
+            text = text[3:]
+        if text.endswith('```'):
+            text = text[:-3]
+    return json.loads(text.strip())
+
+
+def build_cards(deck_id, questions):
+    """Turn parsed questions into MCQ cards, skipping incomplete ones."""
+    cards = []
+    for q in questions:
+        question_text = q.get('question')
+        options = q.get('options')
+        answer = q.get('answer')
+
+        if not question_text or not options or not answer:
+            continue
+
+        try:
+            correct_index = options.index(answer)
+        except ValueError:
+            continue
+
+        cards.append(Card(
+            deck_id=deck_id,
+            card_type='mcq',
+            question_text=question_text,
+            options_json=json.dumps(options),
+            correct_index=correct_index,
+            explanation_text=q.get('explanation', '')
+        ))
+    return cards
+
+
+def _generate_questions(job, client, chunk_chars, max_parallel):
+    chunks = chunk_text(job.source_content, chunk_chars)
+    work = [
+        (chunk, count)
+        for chunk, count in zip(chunks, allocate_questions(chunks, job.num_questions))
+        if count
+    ]
+    if not work:
+        raise GenerationError('Source content is empty.')
+    job.chunks_total = len(work)
+    db.session.commit()
+
+    prompts = [build_prompt(chunk, count, job.difficulty) for chunk, count in work]
+    questions = []
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(prompts))) as pool:
+        for text in pool.map(client.generate, prompts):
+            questions.extend(parse_questions(text))
+            job.chunks_done += 1
+            db.session.commit()
+    return questions
+
+
+def _claimable(stale_after):
+    """Jobs still queued, or left running for over ``stale_after`` seconds by a crash or restart."""
+    stale = db.and_(
+        GenerationJob.status == 'running',
+        GenerationJob.started_at < datetime.utcnow() - timedelta(seconds=stale_after)
+    )
+    return db.or_(GenerationJob.status == 'queued', stale)
+
+
+def run_job(job_id, client, chunk_chars, max_parallel, stale_after):
+    """Execute one queued or stale job. Needs an app context.
+
+    The job is claimed with a conditional ``UPDATE`` so it is run by one worker
+    at a time, even when several workers or processes drain the same table. A
+    job that has been ``running`` for more than ``stale_after`` seconds is
+    assumed lost and may be claimed again. Question lists already in the
+    content-hash cache are reused without calling the model.
+    """
+    claimed = db.session.execute(
+        db.update(GenerationJob).where(
+            GenerationJob.id == job_id,
+            _claimable(stale_after)
+        ).values(status='running', started_at=datetime.utcnow(), chunks_done=0, error=None)
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        return
+
+    job = db.session.get(GenerationJob, job_id)
+    try:
+        key = question_cache.cache_key(job.source_content, job.difficulty, job.num_questions, client.model_name)
+        questions = question_cache.get(key)
+        from_cache = questions is not None
+        if not from_cache:
+            questions = _generate_questions(job, client, chunk_chars, max_parallel)
+
+        cards = build_cards(job.deck_id, questions)
+        db.session.add_all(cards)
+        if cards:
+            bump_content_version(job.deck)
+            # A response with no usable questions is not cached, so a retry asks the model again
+            if not from_cache:
+                question_cache.put(key, client.model_name, questions)
+        job.cards_created = len(cards)
+        job.status = 'done'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        if cards:
+            fragments.invalidate_deck(job.deck)
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(GenerationJob, job_id)
+        if job is None:
+            # The deck (and its jobs) was deleted while generating
+            return
+        if isinstance(e, json.JSONDecodeError):
+            job.error = 'AI returned invalid data format. Please try again or simplify content.'
+        else:
+            job.error = f'AI Error: {str(e)}'
+        job.status = 'failed'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+def pending_job_ids(stale_after):
+    return db.session.scalars(
+        db.select(GenerationJob.id).where(_claimable(stale_after)).order_by(GenerationJob.id)
+    ).all()
+
+
+class GenerationRunner:
+    """Per-app worker pool for generation jobs, stored in ``app.extensions``."""
+
+    def __init__(self, app, client=None):
+        self.app = app
+        self._client = client
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = make_client(self.app.config)
+            return self._client
+
+    @client.setter
+    def client(self, client):
+        with self._lock:
+            self._client = client
+
+    def execute(self, job_id):
+        """Run ``job_id`` in the current app context."""
+        config = self.app.config
+        run_job(job_id, self.client, config['AI_CHUNK_CHARS'], config['AI_MAX_PARALLEL_CHUNKS'],
+                config['AI_JOB_TIMEOUT'])
+
+    def run(self, job_id):
+        with self.app.app_context():
+            self.execute(job_id)
+
+    def submit(self, job_id):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.app.config['AI_WORKERS'],
+                    thread_name_prefix='ai-generate'
+                )
+        return self._executor.submit(self.run, job_id)
+
+    def shutdown(self, wait=True):
+        # Wait outside the lock: running jobs take it to read the client
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def init_app(app, client=None):
+    app.extensions['generation'] = GenerationRunner(app, client)
+
+
+def runner(app):
+    return app.extensions['generation']
+
+
+def submit_job(app, deck, user_id, source_content, num_questions, difficulty):
+    """Record a generation job for ``deck`` and hand it to the worker pool.
+
+    Cached generations are run inline, so the returned job is already done.
+    Raises ``GenerationError`` if no model client can be configured.
+    """
+    worker = runner(app)
+    # Build the client now so configuration errors reach the user, not the job
+    model_name = worker.client.model_name
+
+    job = GenerationJob(
+        deck_id=deck.id,
+        user_id=user_id,
+        source_content=source_content,
+        num_questions=num_questions,
+        difficulty=difficulty
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    if question_cache.is_cached(question_cache.cache_key(source_content, difficulty, num_questions, model_name)):
+        worker.execute(job.id)
+        db.session.refresh(job)
+    else:
+        worker.submit(job.id)
+    return job
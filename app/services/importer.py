@@ -0,0 +1,130 @@
+"""Bulk card import from CSV or JSON Lines.
+
+Rows are parsed one at a time from the input stream, validated with the same
+rules as the add-card form and inserted in batches with a single executemany
+``INSERT`` per batch, committing after each batch.
+"""
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+
+from app import db
+from app.models import Card
+from app.services.cards import card_fields
+from app.services.decks import bump_content_version
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_BATCH_SIZE = 1000
+# Only the first few invalid rows are reported back in detail
+MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        if self.seconds <= 0:
+            return float(self.imported)
+        return self.imported / self.seconds
+
+    def summary(self):
+        text = (f'Imported {self.imported} cards in {self.seconds:.2f}s '
+                f'({self.rows_per_second:,.0f} cards/s)')
+        if self.skipped:
+            text += f'; skipped {self.skipped} invalid rows'
+        return text
+
+
+def detect_format(filename):
+    """Guess the import format from a file name; returns None if unknown."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(line_number, row)`` pairs from a binary or text stream without reading it all."""
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f'Invalid JSON: {e.msg}')
+                continue
+            if not isinstance(row, dict):
+                row = ValueError('Each line must be a JSON object')
+            yield line_number, row
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def import_cards(deck, stream, fmt, batch_size=IMPORT_BATCH_SIZE):
+    """Import every valid row of ``stream`` into ``deck`` and return an ``ImportReport``.
+
+    Cards are created with the deck's question type. Each batch is committed
+    on its own, so a failure part way through keeps the batches already
+    written and re-raises.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    deck_id = deck.id
+    card_type = deck.question_type
+    insert = Card.__table__.insert()
+    batch = []
+
+    def flush():
+        db.session.execute(insert, batch)
+        bump_content_version(deck)
+        db.session.commit()
+        report.imported += len(batch)
+        batch.clear()
+
+    try:
+        for line_number, row in iter_rows(stream, fmt):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                values = card_fields(card_type, row)
+            except (ValueError, TypeError) as e:
+                report.skipped += 1
+                if len(report.errors) < MAX_REPORTED_ERRORS:
+                    report.errors.append(f'Line {line_number}: {e}')
+                continue
+
+            values['deck_id'] = deck_id
+            values['card_type'] = card_type
+            batch.append(values)
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        report.seconds = time.perf_counter() - started
+
+    return report
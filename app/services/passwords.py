@@ -0,0 +1,76 @@
+"""Password hashing with configurable cost.
+
+``PASSWORD_HASH_METHOD`` and ``PASSWORD_HASH_ITERATIONS`` select the werkzeug
+method for new hashes. Hashes run in the request thread, but a per-app
+semaphore caps how many run at once (``PASSWORD_HASH_CONCURRENCY``). In a
+login burst the extra logins wait their turn instead of all competing for the
+CPU. A successful login with a hash made under older settings is rehashed
+with the current ones.
+"""
+import threading
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# scrypt's block size and parallelism; PASSWORD_HASH_ITERATIONS is its cost N
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_PARALLELISM = 1
+
+
+def hash_method(config):
+    """The werkzeug method string for the configured settings, e.g. ``pbkdf2:sha256:600000``."""
+    method = config['PASSWORD_HASH_METHOD']
+    iterations = config['PASSWORD_HASH_ITERATIONS']
+    if method == 'scrypt':
+        return f'scrypt:{iterations}:{SCRYPT_BLOCK_SIZE}:{SCRYPT_PARALLELISM}'
+    if method.startswith('pbkdf2'):
+        hash_name = method.partition(':')[2] or 'sha256'
+        return f'pbkdf2:{hash_name}:{iterations}'
+    raise ValueError(f"Unsupported PASSWORD_HASH_METHOD '{method}'.")
+
+
+def needs_rehash(password_hash, method):
+    return password_hash.split('$', 1)[0] != method
+
+
+class PasswordHasher:
+    """Per-app hashing limiter, stored in ``app.extensions``."""
+
+    def __init__(self, app):
+        self.method = hash_method(app.config)
+        self._slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_CONCURRENCY'])
+
+    def hash(self, password):
+        with self._slots:
+            return generate_password_hash(password, self.method)
+
+    def verify(self, password_hash, password):
+        with self._slots:
+            return check_password_hash(password_hash, password)
+
+
+def init_app(app):
+    app.extensions['passwords'] = PasswordHasher(app)
+
+
+def hasher(app=None):
+    return (app or current_app).extensions['passwords']
+
+
+def hash_password(password):
+    """Hash ``password`` with the current app's settings, waiting for a free hashing slot."""
+    return hasher().hash(password)
+
+
+def check_login(user, password):
+    """Verify ``password`` for ``user``, waiting for a free hashing slot.
+
+    On success, a hash made with other settings is replaced with one made with
+    the current settings. The caller commits.
+    """
+    worker = hasher()
+    if not worker.verify(user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash, worker.method):
+        user.password_hash = worker.hash(password)
+    return True
@@ -0,0 +1,159 @@
+"""Learning progress aggregated over decks and classes."""
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, case, func
+
+from app import db
+from app.models import Card, CardProgress, ClassMember, Deck, StudyResult, User
+from app.services.cache import TTLCache
+from app.services.rollup import passing_expression
+
+# Window used for a student's "recent" accuracy on the class analytics page
+RECENT_ACCURACY_DAYS = 30
+
+_class_analytics_cache = TTLCache(maxsize=256, ttl=300)
+
+
+class DeckProgress(NamedTuple):
+    deck_id: int
+    total_cards: int
+    learned_cards: int
+
+    @property
+    def percent(self):
+        if self.total_cards == 0:
+            return 0
+        return int((self.learned_cards / self.total_cards) * 100)
+
+
+def deck_progress(user_id, deck_ids):
+    """Return ``{deck_id: DeckProgress}`` for ``user_id`` across ``deck_ids``.
+
+    A card counts as learned once the user has a progress row for it. Runs a
+    single grouped query however many decks are requested; decks without
+    cards are reported with zero totals.
+    """
+    deck_ids = {deck_id for deck_id in deck_ids if deck_id is not None}
+    if not deck_ids:
+        return {}
+
+    rows = db.session.query(
+        Card.deck_id,
+        func.count(Card.id),
+        func.count(CardProgress.card_id)
+    ).outerjoin(
+        CardProgress,
+        and_(CardProgress.card_id == Card.id, CardProgress.user_id == user_id)
+    ).filter(
+        Card.deck_id.in_(deck_ids)
+    ).group_by(Card.deck_id).all()
+
+    progress = {deck_id: DeckProgress(deck_id, 0, 0) for deck_id in deck_ids}
+    for deck_id, total_cards, learned_cards in rows:
+        progress[deck_id] = DeckProgress(deck_id, total_cards, learned_cards)
+    return progress
+
+
+class StudentMastery(NamedTuple):
+    student_id: int
+    email: Optional[str]
+    username: Optional[str]
+    joined_at: datetime
+    cards_learned: int
+    cards_due: int
+    recent_attempts: int
+    recent_passes: int
+    last_activity: datetime
+
+    @property
+    def recent_accuracy(self):
+        if self.recent_attempts == 0:
+            return None
+        return int((self.recent_passes / self.recent_attempts) * 100)
+
+    def to_dict(self):
+        data = self._asdict()
+        data['recent_accuracy'] = self.recent_accuracy
+        data['joined_at'] = self.joined_at.isoformat() if self.joined_at else None
+        data['last_activity'] = self.last_activity.isoformat() if self.last_activity else None
+        return data
+
+
+def class_analytics(class_id):
+    """Return a ``StudentMastery`` for every member of ``class_id``, sorted by email.
+
+    Only cards and results from the class's decks are counted. Uses three
+    grouped queries whatever the class size, and caches the result per class
+    until ``invalidate_class_analytics`` is called or the entry expires.
+    """
+    cached = _class_analytics_cache.get(class_id)
+    if cached is not None:
+        return cached
+
+    today = date.today()
+    recent_since = datetime.combine(today - timedelta(days=RECENT_ACCURACY_DAYS), datetime.min.time())
+    member_ids = db.select(ClassMember.student_id).where(ClassMember.class_id == class_id)
+
+    members = db.session.query(ClassMember.student_id, User.email, User.username, ClassMember.joined_at).join(
+        User, User.id == ClassMember.student_id
+    ).filter(ClassMember.class_id == class_id).order_by(User.email).all()
+
+    progress_rows = db.session.query(
+        CardProgress.user_id,
+        func.count(CardProgress.card_id),
+        func.sum(case((CardProgress.next_review_date <= today, 1), else_=0))
+    ).join(Card, Card.id == CardProgress.card_id).join(Deck, Deck.id == Card.deck_id).filter(
+        Deck.class_id == class_id,
+        CardProgress.user_id.in_(member_ids)
+    ).group_by(CardProgress.user_id).all()
+    progress_by_user = {user_id: (learned, int(due or 0)) for user_id, learned, due in progress_rows}
+
+    is_recent = StudyResult.completed_at >= recent_since
+    result_rows = db.session.query(
+        StudyResult.user_id,
+        func.sum(case((is_recent, 1), else_=0)),
+        func.sum(case((is_recent, passing_expression()), else_=0)),
+        func.max(StudyResult.completed_at)
+    ).join(Deck, Deck.id == StudyResult.deck_id).filter(
+        Deck.class_id == class_id,
+        StudyResult.user_id.in_(member_ids)
+    ).group_by(StudyResult.user_id).all()
+    results_by_user = {
+        user_id: (int(attempts or 0), int(passes or 0), last_activity)
+        for user_id, attempts, passes, last_activity in result_rows
+    }
+
+    analytics = []
+    for student_id, email, username, joined_at in members:
+        learned, due = progress_by_user.get(student_id, (0, 0))
+        attempts, passes, last_activity = results_by_user.get(student_id, (0, 0, None))
+        analytics.append(StudentMastery(
+            student_id, email, username, joined_at, learned, due, attempts, passes, last_activity
+        ))
+
+    _class_analytics_cache.set(class_id, analytics)
+    return analytics
+
+
+def invalidate_class_analytics(class_ids):
+    for class_id in class_ids:
+        _class_analytics_cache.pop(class_id)
+
+
+def invalidate_for_cards(card_ids):
+    """Drop cached analytics for the classes that own any of ``card_ids``."""
+    card_ids = set(card_ids)
+    if not card_ids:
+        return
+    rows = db.session.query(Deck.class_id).join(Card, Card.deck_id == Deck.id).filter(
+        Card.id.in_(card_ids),
+        Deck.class_id.isnot(None)
+    ).distinct().all()
+    invalidate_class_analytics([row.class_id for row in rows])
+
+
+def invalidate_for_deck(deck_id):
+    deck = db.session.get(Deck, deck_id)
+    if deck is not None and deck.class_id is not None:
+        invalidate_class_analytics([deck.class_id])
@@ -0,0 +1,84 @@
+"""Persistent cache of AI-generated question lists.
+
+Entries are keyed on a hash of the normalized (source_content, difficulty,
+num_questions, model_name), so resubmitting the same material skips the
+model entirely. Entries expire after ``AI_CACHE_TTL`` seconds and the table
+is trimmed to ``AI_CACHE_MAX_ENTRIES`` by least recent use.
+
+Like ``app.services.rollup``, these helpers leave the commit to the caller.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import db
+from app.models import GeneratedQuestionCache
+
+
+def cache_key(source_content, difficulty, num_questions, model_name):
+    # Whitespace and case differences in pasted text should still hit
+    normalized = [
+        ' '.join(source_content.split()).lower(),
+        (difficulty or '').strip().lower(),
+        int(num_questions),
+        model_name,
+    ]
+    return hashlib.sha256(json.dumps(normalized).encode('utf-8')).hexdigest()
+
+
+def _expiry_cutoff():
+    return datetime.utcnow() - timedelta(seconds=current_app.config['AI_CACHE_TTL'])
+
+
+def is_cached(key):
+    return db.session.query(
+        db.session.query(GeneratedQuestionCache).filter(
+            GeneratedQuestionCache.key == key,
+            GeneratedQuestionCache.created_at >= _expiry_cutoff()
+        ).exists()
+    ).scalar()
+
+
+def get(key):
+    """Return the cached question list for ``key`` or None, marking it as used."""
+    entry = db.session.get(GeneratedQuestionCache, key)
+    if entry is None:
+        return None
+    if entry.created_at < _expiry_cutoff():
+        db.session.delete(entry)
+        return None
+    entry.last_used_at = datetime.utcnow()
+    return json.loads(entry.questions_json)
+
+
+def put(key, model_name, questions):
+    """Store ``questions`` under ``key`` and evict expired and least recently used entries."""
+    now = datetime.utcnow()
+    db.session.merge(GeneratedQuestionCache(
+        key=key,
+        model_name=model_name,
+        questions_json=json.dumps(questions),
+        created_at=now,
+        last_used_at=now
+    ))
+    db.session.flush()
+    prune()
+
+
+def prune():
+    GeneratedQuestionCache.query.filter(
+        GeneratedQuestionCache.created_at < _expiry_cutoff()
+    ).delete(synchronize_session=False)
+
+    max_entries = current_app.config['AI_CACHE_MAX_ENTRIES']
+    stale_keys = db.session.scalars(
+        db.select(GeneratedQuestionCache.key).order_by(
+            GeneratedQuestionCache.last_used_at.desc()
+        ).offset(max_entries)
+    ).all()
+    if stale_keys:
+        GeneratedQuestionCache.query.filter(
+            GeneratedQuestionCache.key.in_(stale_keys)
+        ).delete(synchronize_session=False)
@@ -0,0 +1,83 @@
+"""Cross-deck review sessions built from the user's due cards."""
+from datetime import date
+
+from sqlalchemy import and_, func, or_
+
+from app import db
+from app.models import Card, CardProgress, Deck
+from app.services.access import accessible_decks_clause
+from app.services.decks import serialize_card
+from app.services.scheduler import DEFAULT_EASE
+
+# Queue order: most overdue first, then lowest ease, then card id
+_ease = func.coalesce(CardProgress.ease_factor, DEFAULT_EASE)
+
+
+def _due_query(user_id, today, *columns):
+    return db.session.query(*columns).join(
+        Card, Card.id == CardProgress.card_id
+    ).join(Deck, Deck.id == Card.deck_id).filter(
+        CardProgress.user_id == user_id,
+        CardProgress.next_review_date <= today,
+        accessible_decks_clause(user_id)
+    )
+
+
+def encode_cursor(next_review_date, ease, card_id):
+    return f'{next_review_date.isoformat()}:{float(ease)!r}:{card_id}'
+
+
+def decode_cursor(cursor):
+    """Parse a cursor from ``encode_cursor``; returns None if missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        next_review, ease, card_id = cursor.split(':')
+        return (date.fromisoformat(next_review), float(ease), int(card_id))
+    except ValueError:
+        return None
+
+
+def _after(cursor):
+    # Keyset condition for rows that sort after the cursor
+    next_review, ease, card_id = cursor
+    return or_(
+        CardProgress.next_review_date > next_review,
+        and_(CardProgress.next_review_date == next_review, _ease > ease),
+        and_(CardProgress.next_review_date == next_review, _ease == ease, CardProgress.card_id > card_id)
+    )
+
+
+def review_page(user_id, limit, after=None, today=None):
+    """Return ``(cards_data, next_cursor, total_due)`` for one page of the review queue.
+
+    ``after`` is the cursor returned with the previous page. ``next_cursor`` is
+    None once the queue is exhausted. Each page is a keyset query that reads
+    ``limit + 1`` rows (the extra one shows whether another page follows),
+    plus a COUNT for the total. The cost of a page does not depend on how far
+    into the queue it is.
+    """
+    today = today or date.today()
+    total_due = _due_query(user_id, today, func.count(CardProgress.card_id)).scalar()
+
+    query = _due_query(user_id, today, Card, CardProgress.next_review_date, _ease)
+    cursor = decode_cursor(after)
+    if cursor is not None:
+        query = query.filter(_after(cursor))
+    rows = query.order_by(CardProgress.next_review_date, _ease, CardProgress.card_id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    cards_data = []
+    for card, _, _ in rows:
+        try:
+            cards_data.append(serialize_card(card))
+        except Exception:
+            continue
+
+    next_cursor = None
+    if has_more:
+        card, next_review, ease = rows[-1]
+        next_cursor = encode_cursor(next_review, ease, card.id)
+    return cards_data, next_cursor, total_due
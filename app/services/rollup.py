@@ -0,0 +1,102 @@
+"""Daily rollup of study results.
+
+``study_daily_rollup`` holds one row per (user, day, question type) with the
+number of results, how many passed and the score totals. ``record_result``
+keeps it current as results are saved and ``backfill`` rebuilds it from
+``study_results``, so statistics pages read at most one row per day instead of
+every result.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, case, func
+
+from app import db
+from app.models import StudyDailyRollup, StudyResult
+
+COUNTERS = ('attempts', 'passes', 'score_sum', 'max_score_sum')
+
+
+def is_passing(score, max_score):
+    """A result passes when it scores at least half of ``max_score``."""
+    return (max_score or 0) > 0 and (score or 0) * 2 >= max_score
+
+
+def passing_expression():
+    """SQL counterpart of ``is_passing``: 1 for a passing result row, else 0."""
+    return case(
+        (and_(StudyResult.max_score > 0, StudyResult.score * 2 >= StudyResult.max_score), 1),
+        else_=0
+    )
+
+
+def record_result(result):
+    """Add ``result`` to its day's rollup row in the current transaction."""
+    score = result.score or 0
+    max_score = result.max_score or 0
+    values = {
+        'user_id': result.user_id,
+        'day': (result.completed_at or datetime.utcnow()).date(),
+        'question_type': result.question_type,
+        'attempts': 1,
+        'passes': 1 if is_passing(score, max_score) else 0,
+        'score_sum': score,
+        'max_score_sum': max_score,
+    }
+
+    table = StudyDailyRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day, table.c.question_type],
+            set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS}
+        )
+        db.session.execute(stmt)
+    elif dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            {name: table.c[name] + stmt.inserted[name] for name in COUNTERS}
+        )
+        db.session.execute(stmt)
+    else:
+        row = db.session.get(StudyDailyRollup, (values['user_id'], values['day'], values['question_type']))
+        if row is None:
+            db.session.add(StudyDailyRollup(**values))
+        else:
+            for name in COUNTERS:
+                setattr(row, name, getattr(row, name) + values[name])
+
+
+def backfill(user_id=None):
+    """Rebuild rollup rows from ``study_results`` and return how many were written.
+
+    Rebuilds every user unless ``user_id`` is given. The caller commits.
+    """
+    delete = StudyDailyRollup.query
+    if user_id is not None:
+        delete = delete.filter(StudyDailyRollup.user_id == user_id)
+    delete.delete(synchronize_session=False)
+
+    day = func.date(StudyResult.completed_at)
+    passed = passing_expression()
+    select = db.select(
+        StudyResult.user_id,
+        day,
+        StudyResult.question_type,
+        func.count(StudyResult.id),
+        func.sum(passed),
+        func.coalesce(func.sum(StudyResult.score), 0),
+        func.coalesce(func.sum(StudyResult.max_score), 0),
+    ).where(StudyResult.completed_at.isnot(None))
+    if user_id is not None:
+        select = select.where(StudyResult.user_id == user_id)
+    select = select.group_by(StudyResult.user_id, day, StudyResult.question_type)
+
+    table = StudyDailyRollup.__table__
+    insert = table.insert().from_select(
+        ['user_id', 'day', 'question_type', *COUNTERS], select
+    )
+    return db.session.execute(insert).rowcount
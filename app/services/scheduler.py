@@ -0,0 +1,85 @@
+"""SM-2 spaced repetition scheduling.
+
+Pure functions with no database or Flask dependencies. ``review`` updates a
+single card state and is what the study routes use. ``review_batch`` applies
+the same rules to whole arrays of card states with NumPy, for imports,
+rescheduling jobs and simulations over many cards at once.
+"""
+from datetime import timedelta
+from typing import NamedTuple
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+MAX_QUALITY = 5
+
+
+class CardState(NamedTuple):
+    ease_factor: float
+    interval_days: int
+    repetitions: int
+
+
+def review(ease_factor, interval_days, repetitions, quality):
+    """Return the new ``CardState`` after answering a card with ``quality`` (0-5).
+
+    Missing values (e.g. a progress row that has not been inserted yet) fall
+    back to a brand new card.
+    """
+    if quality < 0 or quality > MAX_QUALITY:
+        raise ValueError(f'Quality must be between 0 and {MAX_QUALITY}')
+
+    ease_factor = DEFAULT_EASE if ease_factor is None else float(ease_factor)
+    interval_days = interval_days or 0
+    repetitions = repetitions or 0
+
+    if quality < PASSING_QUALITY:
+        repetitions = 0
+        interval_days = 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = int(interval_days * ease_factor)
+        repetitions += 1
+
+    miss = MAX_QUALITY - quality
+    ease_factor = max(ease_factor + (0.1 - miss * (0.08 + miss * 0.02)), MIN_EASE)
+
+    return CardState(ease_factor, interval_days, repetitions)
+
+
+def next_review_date(review_date, interval_days):
+    return review_date + timedelta(days=interval_days)
+
+
+def review_batch(ease_factors, interval_days, repetitions, qualities):
+    """Vectorized ``review`` over equally sized array-likes.
+
+    Returns ``(ease_factors, interval_days, repetitions)`` as new NumPy arrays;
+    the inputs are not modified. Each position is one independent review, so
+    repeated reviews of the same card must be applied in separate calls.
+    """
+    import numpy as np
+
+    ease = np.asarray(ease_factors, dtype=np.float64)
+    interval = np.asarray(interval_days, dtype=np.int64)
+    reps = np.asarray(repetitions, dtype=np.int64)
+    quality = np.asarray(qualities, dtype=np.int64)
+
+    if quality.size and (quality.min() < 0 or quality.max() > MAX_QUALITY):
+        raise ValueError(f'Quality must be between 0 and {MAX_QUALITY}')
+
+    passed = quality >= PASSING_QUALITY
+    grown = np.trunc(interval * ease).astype(np.int64)
+
+    new_interval = np.where(reps == 0, 1, np.where(reps == 1, 6, grown))
+    new_interval = np.where(passed, new_interval, 1)
+    new_reps = np.where(passed, reps + 1, 0)
+
+    miss = MAX_QUALITY - quality
+    new_ease = np.maximum(ease + (0.1 - miss * (0.08 + miss * 0.02)), MIN_EASE)
+
+    return new_ease, new_interval, new_reps
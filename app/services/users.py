@@ -0,0 +1,92 @@
+"""Cached identities for Flask-Login.
+
+``load_user`` runs on every authenticated request. Instead of loading the
+``users`` row and its memberships each time, it returns a ``UserSnapshot``
+with the few fields the views use, kept in a bounded TTL cache. Mapper events
+drop a user's snapshot (and their cached class ids) whenever their role or
+class memberships change, or the user is deleted. Other worker processes only
+see the change once the TTL expires, so it matches the access cache's TTL: a
+deleted or demoted user keeps their old permissions there for at most
+``ACCESS_CACHE_TTL`` seconds.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+
+from app import db, login
+from app.models import ClassMember, User
+from app.services import access
+from app.services.cache import TTLCache
+
+USER_CACHE_TTL = access.ACCESS_CACHE_TTL
+
+_snapshots = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL)
+
+
+class UserSnapshot:
+    """Read-only stand-in for ``User`` as ``current_user``."""
+
+    __slots__ = ('id', 'role', 'email', 'class_ids')
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, id, role, email, class_ids):
+        self.id = id
+        self.role = role
+        self.email = email
+        self.class_ids = class_ids
+
+    def get_id(self):
+        return str(self.id)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.email}>'
+
+
+def snapshot(user_id):
+    """Return the cached ``UserSnapshot`` for ``user_id``, or None if the user is gone."""
+    cached = _snapshots.get(user_id)
+    if cached is not None:
+        return cached
+
+    row = db.session.query(User.id, User.role, User.email).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    cached = UserSnapshot(row.id, row.role, row.email, access.class_ids(user_id))
+    _snapshots.set(user_id, cached)
+    return cached
+
+
+def forget(user_ids):
+    user_ids = list(user_ids)
+    for user_id in user_ids:
+        _snapshots.pop(user_id)
+    access.forget(user_ids)
+
+
+@login.user_loader
+def load_user(id):
+    return snapshot(int(id))
+
+
+@event.listens_for(ClassMember, 'after_insert')
+@event.listens_for(ClassMember, 'after_delete')
+def _membership_changed(mapper, connection, member):
+    forget([member.student_id])
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, user):
+    forget([user.id])
+
+
+@event.listens_for(User, 'after_update')
+def _user_changed(mapper, connection, user):
+    if get_history(user, 'role').has_changes() or get_history(user, 'email').has_changes():
+        forget([user.id])
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, user):
+    forget([user.id])
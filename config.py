@@ -1,8 +1,64 @@
 import os
+from dotenv import load_dotenv
+
+load_dotenv()
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'you-will-never-guess'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Per-request query/render timing headers, JSON log lines and /admin/metrics (see app/profiling.py)
+    PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+    # /admin/metrics is 404 unless a token is set (sent as the X-Metrics-Token header)...
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # ...or tokenless localhost access is enabled; never enable this behind a local reverse proxy
+    METRICS_ALLOW_LOCALHOST = os.environ.get('METRICS_ALLOW_LOCALHOST', '').lower() in ('1', 'true', 'yes')
+    # Optional read-only copy of the database for read-heavy pages (see app/engine.py)
+    SQLALCHEMY_READ_REPLICA_URI = os.environ.get('DATABASE_READ_URL')
+    READ_REPLICA_STICKY_SECONDS = int(os.environ.get('READ_REPLICA_STICKY_SECONDS') or 10)
+    # Connection pool for MySQL (see app/engine.py); not used for SQLite
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 280)
+    # Pragmas applied to every SQLite connection; set one to None to keep SQLite's default
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    # Page cache per connection, not per process: each pooled connection (up to 15 with the
+    # default SQLite pool) can hold this much
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 8000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    # Hash settings for new passwords; older hashes are upgraded on the next login.
+    # 'scrypt' (ITERATIONS = cost N, a power of two) or 'pbkdf2:sha256' (ITERATIONS = rounds).
+    # Compare costs with scripts/bench_password_hashing.py
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+    PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS') or 32768)
+    # Password hashes allowed to run at once per process (see app/services/passwords.py)
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY') or os.cpu_count() or 1)
+    # Cached dashboard and deck-list fragments (see app/fragments.py):
+    # 'memory' (per process), 'filesystem' or 'sqlite' (shared by the workers on a host), or 'none'
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND') or 'memory'
+    # Directory (filesystem) or database file (sqlite); defaults to instance/fragment-cache.
+    # Keep it private to the app's user: cached fragments are served as trusted HTML
+    FRAGMENT_CACHE_PATH = os.environ.get('FRAGMENT_CACHE_PATH')
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL') or 600)
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get('FRAGMENT_CACHE_MAX_ENTRIES') or 10000)
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    # Daily caps for due-only study sessions (/study/session/<id>?mode=due)
+    STUDY_NEW_CARD_LIMIT = int(os.environ.get('STUDY_NEW_CARD_LIMIT') or 20)
+    STUDY_REVIEW_CARD_LIMIT = int(os.environ.get('STUDY_REVIEW_CARD_LIMIT') or 100)
+    # Seconds the browser may reuse /study/session/<id>.json and /decks/<id>/cards pages
+    STUDY_PAYLOAD_MAX_AGE = int(os.environ.get('STUDY_PAYLOAD_MAX_AGE') or 60)
+    # Background AI quiz generation: 'gemini' or 'fake' (offline, for tests and benchmarks)
+    AI_MODEL_CLIENT = os.environ.get('AI_MODEL_CLIENT') or 'gemini'
+    AI_MODEL_NAME = os.environ.get('AI_MODEL_NAME') or 'gemini-flash-latest'
+    AI_WORKERS = int(os.environ.get('AI_WORKERS') or 2)
+    # Source text is split into chunks of this size, generated concurrently
+    AI_CHUNK_CHARS = int(os.environ.get('AI_CHUNK_CHARS') or 6000)
+    AI_MAX_PARALLEL_CHUNKS = int(os.environ.get('AI_MAX_PARALLEL_CHUNKS') or 4)
+    # Jobs still 'running' after this many seconds are treated as lost and can be run again
+    AI_JOB_TIMEOUT = int(os.environ.get('AI_JOB_TIMEOUT') or 1800)
+    # Content-hash cache of generated questions (seconds / entries)
+    AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL') or 30 * 24 * 3600)
+    AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES') or 500)
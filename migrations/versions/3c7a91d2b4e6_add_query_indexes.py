@@ -0,0 +1,47 @@
+"""Add indexes for due-card, stats and deck listing queries
+
+Revision ID: 3c7a91d2b4e6
+Revises: ef84bcee5d82
+Create Date: 2026-10-18 09:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7a91d2b4e6'
+down_revision = 'ef84bcee5d82'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_card_progress_user_next_review', 'card_progress', ['user_id', 'next_review_date']),
+    ('ix_study_results_user_completed_type', 'study_results', ['user_id', 'completed_at', 'question_type']),
+    ('ix_cards_deck_id', 'cards', ['deck_id']),
+    ('ix_decks_owner_visibility', 'decks', ['owner_id', 'visibility']),
+    ('ix_decks_class_visibility', 'decks', ['class_id', 'visibility']),
+]
+
+
+def _existing_indexes(inspector, table):
+    return {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def upgrade():
+    # Most tables were created with db.create_all() rather than by earlier
+    # revisions, so only touch tables that exist and skip indexes already there.
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables and name not in _existing_indexes(inspector, table):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for name, table, _ in reversed(INDEXES):
+        if table in tables and name in _existing_indexes(inspector, table):
+            op.drop_index(name, table_name=table)
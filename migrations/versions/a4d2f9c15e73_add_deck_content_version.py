@@ -0,0 +1,33 @@
+"""Add content_version to decks
+
+Revision ID: a4d2f9c15e73
+Revises: e110568188da
+Create Date: 2026-10-18 13:26:52.907114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d2f9c15e73'
+down_revision = 'e110568188da'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # decks is created by db.create_all() rather than by an earlier revision
+    if not sa.inspect(op.get_bind()).has_table('decks'):
+        return
+
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table('decks'):
+        return
+
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
@@ -0,0 +1,36 @@
+"""Add generation_cache table
+
+Revision ID: d5a81f3e6c04
+Revises: 7b3e5d1c9a28
+Create Date: 2026-10-18 16:20:13.804519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a81f3e6c04'
+down_revision = '7b3e5d1c9a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('generation_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('model_name', sa.String(length=100), nullable=False),
+    sa.Column('questions_json', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('generation_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_generation_cache_last_used_at'), ['last_used_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('generation_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generation_cache_last_used_at'))
+
+    op.drop_table('generation_cache')
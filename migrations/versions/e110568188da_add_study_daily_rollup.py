@@ -0,0 +1,47 @@
+"""Add study_daily_rollup table
+
+Revision ID: e110568188da
+Revises: 3c7a91d2b4e6
+Create Date: 2026-10-18 10:41:07.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e110568188da'
+down_revision = '3c7a91d2b4e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('study_daily_rollup',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('question_type', sa.String(length=50), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('passes', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Integer(), nullable=False),
+    sa.Column('max_score_sum', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'question_type')
+    )
+
+    # Populate from existing results so /stats keeps showing history after upgrade
+    if 'study_results' in sa.inspect(op.get_bind()).get_table_names():
+        op.execute("""
+            INSERT INTO study_daily_rollup
+                (user_id, day, question_type, attempts, passes, score_sum, max_score_sum)
+            SELECT user_id, DATE(completed_at), question_type, COUNT(id),
+                   SUM(CASE WHEN max_score > 0 AND score * 2 >= max_score THEN 1 ELSE 0 END),
+                   COALESCE(SUM(score), 0), COALESCE(SUM(max_score), 0)
+            FROM study_results
+            WHERE completed_at IS NOT NULL
+            GROUP BY user_id, DATE(completed_at), question_type
+        """)
+
+
+def downgrade():
+    op.drop_table('study_daily_rollup')
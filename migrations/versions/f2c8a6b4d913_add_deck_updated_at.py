@@ -0,0 +1,38 @@
+"""Add updated_at to decks
+
+Revision ID: f2c8a6b4d913
+Revises: d5a81f3e6c04
+Create Date: 2026-10-18 18:42:05.316270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a6b4d913'
+down_revision = 'd5a81f3e6c04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # decks is created by db.create_all() rather than by an earlier revision
+    if not sa.inspect(op.get_bind()).has_table('decks'):
+        return
+
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute('UPDATE decks SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)')
+
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    if not sa.inspect(op.get_bind()).has_table('decks'):
+        return
+
+    with op.batch_alter_table('decks', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
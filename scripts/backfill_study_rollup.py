@@ -0,0 +1,40 @@
+import sys
+import os
+import time
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import User
+from app.services import rollup
+
+app = create_app()
+
+
+def run(email=None):
+    with app.app_context():
+        user_id = None
+        if email:
+            user = User.query.filter_by(email=email).first()
+            if not user:
+                print(f"User with email {email} not found.")
+                return
+            user_id = user.id
+            print(f"Rebuilding study_daily_rollup for {user.email}...")
+        else:
+            print("Rebuilding study_daily_rollup for all users...")
+
+        started = time.perf_counter()
+        try:
+            rows = rollup.backfill(user_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"An error occurred: {e}")
+            return
+        print(f"Wrote {rows} rollup rows in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None)
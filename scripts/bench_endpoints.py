@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Card, Class, ClassMember, Deck, User
+from config import Config
+from generate_synthetic_data import PASSWORD, Scale, generate
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__), text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pick_accounts():
+    """A teacher, one of their classes and decks, and an enrolled student with the class cards."""
+    member = ClassMember.query.order_by(ClassMember.class_id, ClassMember.student_id).first()
+    class_obj = db.session.get(Class, member.class_id)
+    deck = Deck.query.filter_by(class_id=class_obj.id).order_by(Deck.id).first()
+    card_ids = [card_id for (card_id,) in db.session.query(Card.id).join(Deck).filter(
+        Deck.class_id == class_obj.id
+    ).order_by(Card.id)]
+    return {
+        'teacher_email': class_obj.teacher.email,
+        'student_email': db.session.get(User, member.student_id).email,
+        'class_id': class_obj.id,
+        'deck_id': deck.id,
+        'card_ids': card_ids,
+    }
+
+
+def login(app, email):
+    client = app.test_client()
+    response = client.post('/login', data={'email': email, 'password': PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f'Could not log in as {email}')
+    return client
+
+
+def measure(client, method, url, requests, warmup, body=None):
+    """Time ``requests`` sequential calls after ``warmup`` untimed ones.
+
+    ``body(i)``, when given, returns the JSON body for the i-th call.
+    """
+    def call(i):
+        return client.open(url, method=method, json=body(i) if body else None)
+
+    for i in range(warmup):
+        call(i)
+
+    latencies = []
+    queries = []
+    started = time.perf_counter()
+    for i in range(warmup, warmup + requests):
+        request_started = time.perf_counter()
+        response = call(i)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method} {url} returned {response.status_code}')
+        queries.append(int(response.headers.get('X-DB-Query-Count', 0)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'method': method,
+        'url': url,
+        'requests': requests,
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'requests_per_sec': round(requests / elapsed, 1),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark key endpoints on a synthetic dataset and write a JSON report.')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--output', '-o', default='bench_report.json')
+    parser.add_argument('--database', help='existing database URI to use instead of a fresh generated one')
+    parser.add_argument('--compare', metavar='REPORT', help='earlier report to print p50/p95 changes against')
+    for name, value in asdict(Scale()).items():
+        parser.add_argument('--' + name.replace('_', '-'), type=type(value), default=value)
+    args = parser.parse_args()
+    scale = Scale(**{name: getattr(args, name) for name in asdict(Scale())})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = args.database or 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        # Profiling supplies the per-request query counts in the report
+        config = type('BenchConfig', (Config,), {'SQLALCHEMY_DATABASE_URI': uri, 'PROFILE_REQUESTS': True})
+        app = create_app(config)
+        app.logger.disabled = True
+
+        with app.app_context():
+            dataset = None
+            if not args.database:
+                db.create_all()
+                started = time.perf_counter()
+                dataset = generate(scale)
+                print(f"Generated {sum(dataset.values()):,} rows in {time.perf_counter() - started:.1f}s")
+            accounts = pick_accounts()
+
+        student = login(app, accounts['student_email'])
+        teacher = login(app, accounts['teacher_email'])
+        deck_id, class_id, card_ids = accounts['deck_id'], accounts['class_id'], accounts['card_ids']
+
+        def review_body(i):
+            # Spread reviews over the class cards so no single card's interval keeps growing
+            return {'card_id': card_ids[i % len(card_ids)], 'quality': 4}
+
+        cases = [
+            ('dashboard.student', student, 'GET', '/dashboard', None),
+            ('dashboard.teacher', teacher, 'GET', '/dashboard', None),
+            ('decks.list', student, 'GET', '/decks/list', None),
+            ('classes.view.teacher', teacher, 'GET', f'/classes/{class_id}', None),
+            ('classes.view.student', student, 'GET', f'/classes/{class_id}', None),
+            ('study.session', student, 'GET', f'/study/session/{deck_id}', None),
+            ('study.session.due', student, 'GET', f'/study/session/{deck_id}?mode=due', None),
+            ('study.save_progress', student, 'POST', '/study/save_progress', review_body),
+            ('main.stats', student, 'GET', '/stats', None),
+        ]
+
+        results = {}
+        for name, client, method, url, body in cases:
+            results[name] = measure(client, method, url, args.requests, args.warmup, body)
+            r = results[name]
+            print(f"{name:24s} p50={r['p50_ms']:8.2f}ms  p95={r['p95_ms']:8.2f}ms  "
+                  f"{r['requests_per_sec']:8.1f} req/s  {r['queries_per_request']:5.1f} queries")
+
+        with app.app_context():
+            db.engine.dispose()
+
+    report = {
+        'generated_at': datetime.utcnow().isoformat() + 'Z',
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': 'existing' if args.database else 'sqlite (generated)',
+        'scale': None if args.database else asdict(scale),
+        'dataset': dataset,
+        'settings': {'requests': args.requests, 'warmup': args.warmup},
+        'endpoints': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        compare(args.compare, report)
+
+
+def compare(path, report):
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f"\nChange vs {path} (commit {baseline.get('git_commit')}):")
+    for name, current in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        deltas = [
+            f"{key}={(current[key] - before[key]) / before[key] * 100:+6.1f}%"
+            for key in ('p50_ms', 'p95_ms', 'queries_per_request') if before[key]
+        ]
+        print(f"  {name:24s} {'  '.join(deltas)}")
+
+
+if __name__ == "__main__":
+    main()
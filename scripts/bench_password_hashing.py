@@ -0,0 +1,102 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import User
+from app.services.passwords import hash_method
+from config import Config
+
+PASSWORD = 'password123'
+
+
+def bench_verify(method, rounds):
+    """Single-threaded hash checks per second, i.e. logins per second on one core."""
+    password_hash = generate_password_hash(PASSWORD, method)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        check_password_hash(password_hash, PASSWORD)
+    elapsed = time.perf_counter() - started
+    return rounds / elapsed, elapsed / rounds * 1000
+
+
+def bench_logins(config, logins, threads):
+    """Full POST /login round trips from ``threads`` concurrent clients."""
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        user = User(email='bench@example.com', role='student')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+
+    failures = []
+
+    def worker(count):
+        for _ in range(count):
+            client = app.test_client()
+            client.post('/login', data={'email': 'bench@example.com', 'password': PASSWORD})
+            with client.session_transaction() as session:
+                if '_user_id' not in session:
+                    failures.append(1)
+
+    shares = [logins // threads + (1 if i < logins % threads else 0) for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        db.engine.dispose()
+    if failures:
+        raise RuntimeError(f'{len(failures)} of {logins} logins failed')
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure logins per second per core for password hash settings.')
+    parser.add_argument('--method', default=Config.PASSWORD_HASH_METHOD, help="'pbkdf2:sha256' or 'scrypt'")
+    parser.add_argument('--iterations', type=int, default=Config.PASSWORD_HASH_ITERATIONS)
+    parser.add_argument('--rounds', type=int, default=20, help='hash checks per setting')
+    parser.add_argument('--logins', type=int, default=40, help='POST /login requests for the end-to-end run')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='concurrent login clients')
+    parser.add_argument('--compare-defaults', action='store_true',
+                        help="also time werkzeug's defaults (scrypt N=32768 and pbkdf2 1,000,000 rounds)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    chosen = hash_method({'PASSWORD_HASH_METHOD': args.method, 'PASSWORD_HASH_ITERATIONS': args.iterations})
+    methods = [chosen]
+    if args.compare_defaults:
+        methods += [m for m in ('scrypt:32768:8:1', 'pbkdf2:sha256:1000000') if m != chosen]
+
+    print(f"{cores} CPU core(s)\n")
+    print(f"{'method':28s} {'ms/hash':>9s} {'logins/s/core':>14s}")
+    for method in methods:
+        rate, ms = bench_verify(method, args.rounds)
+        print(f"{method:28s} {ms:9.1f} {rate:14.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (Config,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'PASSWORD_HASH_METHOD': args.method,
+            'PASSWORD_HASH_ITERATIONS': args.iterations,
+        })
+        rate = bench_logins(config, args.logins, args.threads)
+    print(f"\nPOST /login with {chosen}, {args.threads} client thread(s): "
+          f"{rate:.1f} logins/s, {rate / min(cores, config.PASSWORD_HASH_CONCURRENCY):.1f} per core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Card, CardProgress, Deck, User
+from app.services.decks import card_counts
+from config import Config
+
+
+# SQLite's own defaults: rollback journal, synchronous=FULL, no extra cache or mmap
+BASELINE = {
+    'SQLITE_JOURNAL_MODE': 'DELETE',
+    'SQLITE_SYNCHRONOUS': 'FULL',
+    'SQLITE_BUSY_TIMEOUT_MS': None,
+    'SQLITE_CACHE_SIZE_KB': None,
+    'SQLITE_MMAP_SIZE': None,
+}
+
+
+def make_app(path, overrides):
+    attrs = dict(overrides, SQLALCHEMY_DATABASE_URI='sqlite:///' + path)
+    return create_app(type('BenchConfig', (Config,), attrs))
+
+
+def seed(app, num_cards):
+    with app.app_context():
+        db.create_all()
+        user = User(email='bench@example.com', role='student', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        deck = Deck(owner_id=user.id, title='Bench', question_type='flashcard')
+        db.session.add(deck)
+        db.session.flush()
+        db.session.add_all(
+            Card(deck_id=deck.id, card_type='flashcard', front_text=f'front {i}', back_text=f'back {i}')
+            for i in range(num_cards)
+        )
+        db.session.flush()
+        today = date.today()
+        db.session.add_all(
+            CardProgress(user_id=user.id, card_id=card_id, next_review_date=today + timedelta(days=card_id % 30),
+                         ease_factor=2.5, interval_days=1, repetitions=1)
+            for (card_id,) in db.session.query(Card.id)
+        )
+        db.session.commit()
+        return user.id, deck.id, num_cards
+
+
+def run(app, user_id, deck_id, num_cards, readers, writers, seconds):
+    stop = threading.Event()
+    read_latencies = []
+    counts = {'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with app.app_context():
+                    card_counts([deck_id])
+                    CardProgress.query.filter(
+                        CardProgress.user_id == user_id,
+                        CardProgress.next_review_date <= date.today()
+                    ).count()
+            except Exception:
+                with lock:
+                    counts['errors'] += 1
+                continue
+            with lock:
+                read_latencies.append(time.perf_counter() - started)
+
+    def writer():
+        rng = random.Random()
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    # Same shape as save_progress: one row update and a commit
+                    progress = db.session.get(CardProgress, (user_id, rng.randint(1, num_cards)))
+                    progress.interval_days += 1
+                    progress.next_review_date = date.today() + timedelta(days=progress.interval_days)
+                    db.session.commit()
+            except Exception:
+                with lock:
+                    counts['errors'] += 1
+                continue
+            with lock:
+                counts['writes'] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_latencies.sort()
+    percentile = lambda p: read_latencies[min(len(read_latencies) - 1, int(len(read_latencies) * p))] * 1000
+    return {
+        'reads_per_sec': len(read_latencies) / seconds,
+        'writes_per_sec': counts['writes'] / seconds,
+        'read_p50_ms': percentile(0.50) if read_latencies else 0.0,
+        'read_p95_ms': percentile(0.95) if read_latencies else 0.0,
+        'errors': counts['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare SQLite read throughput under concurrent writes, '
+                                                 'with default settings and with the configured pragmas.')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--cards', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, overrides in (('default', BASELINE), ('tuned', {})):
+            app = make_app(os.path.join(tmp, f'{label}.db'), overrides)
+            user_id, deck_id, num_cards = seed(app, args.cards)
+            result = run(app, user_id, deck_id, num_cards, args.readers, args.writers, args.seconds)
+            with app.app_context():
+                db.engine.dispose()
+            print(f"{label:8s} reads/s={result['reads_per_sec']:8.1f}  writes/s={result['writes_per_sec']:7.1f}  "
+                  f"read p50={result['read_p50_ms']:6.2f}ms  p95={result['read_p95_ms']:7.2f}ms  "
+                  f"errors={result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
-from app.models import User, Deck, Class, ClassMember, StudyResult, CardProgress
+from app.models import User, Deck, Class, ClassMember, StudyResult, StudyDailyRollup, CardProgress, GenerationJob
 
 app = create_app()
 
@@ -40,6 +40,14 @@ with app.app_context():
             db.session.delete(result)
             print(f"Deleted Study Result.")
 
+        # Daily rollups of the study results
+        StudyDailyRollup.query.filter_by(user_id=user.id).delete()
+        print(f"Deleted Study Rollups.")
+
+        # AI generation jobs
+        GenerationJob.query.filter_by(user_id=user.id).delete()
+        print(f"Deleted Generation Jobs.")
+
         # Card Progress
         progress = CardProgress.query.filter_by(user_id=user.id).all()
         for p in progress:
@@ -0,0 +1,51 @@
+import argparse
+import sys
+import os
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Class, User
+from app.services.exporter import (
+    EXPORT_CHUNK_SIZE, EXPORT_DATASETS, EXPORT_FORMATS,
+    class_export_query, stream_export, user_export_query
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream decks, cards, progress or study results to CSV or JSON Lines.')
+    parser.add_argument('dataset', choices=EXPORT_DATASETS)
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument('--user', metavar='EMAIL', help="export a user's own data")
+    scope.add_argument('--class', dest='class_id', type=int, metavar='ID', help="export a class's decks and member history")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--output', '-o', help='defaults to stdout')
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.user:
+            user = User.query.filter_by(email=args.user).first()
+            if not user:
+                print(f"User {args.user} not found.", file=sys.stderr)
+                sys.exit(1)
+            query = user_export_query(args.dataset, user.id)
+        else:
+            if not db.session.get(Class, args.class_id):
+                print(f"Class {args.class_id} not found.", file=sys.stderr)
+                sys.exit(1)
+            query = class_export_query(args.dataset, args.class_id)
+
+        out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for chunk in stream_export(query, args.format, chunk_size=args.chunk_size):
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import json
+import random
+import sys
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Card, CardProgress, Class, ClassMember, Deck, StudyResult, User
+from app.services import passwords, rollup
+
+# Every generated account logs in with this password
+PASSWORD = 'password123'
+INSERT_BATCH_SIZE = 5000
+QUESTION_TYPES = ('flashcard', 'fill_gap', 'mcq')
+
+
+@dataclass
+class Scale:
+    teachers: int = 5
+    classes_per_teacher: int = 2
+    students_per_class: int = 30
+    decks_per_class: int = 5
+    private_decks_per_student: int = 1
+    cards_per_deck: int = 50
+    # Share of each student's class cards that already have review progress
+    progress_ratio: float = 0.6
+    years: int = 2
+    results_per_week: int = 3
+    seed: int = 42
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert(model, rows):
+    table = model.__table__
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.session.execute(table.insert(), rows[start:start + INSERT_BATCH_SIZE])
+    return len(rows)
+
+
+def _invite_code(class_id):
+    digits = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    code = ''
+    while class_id:
+        class_id, remainder = divmod(class_id, 36)
+        code = digits[remainder] + code
+    return 'Z' + code.rjust(5, '0')
+
+
+def _card_row(card_id, deck_id, card_type, n, created_at):
+    row = {
+        'id': card_id, 'deck_id': deck_id, 'card_type': card_type, 'created_at': created_at,
+        'front_text': None, 'back_text': None, 'question_text': None,
+        'answers_json': None, 'options_json': None, 'correct_index': None, 'explanation_text': None,
+    }
+    if card_type == 'flashcard':
+        row.update(front_text=f'Term {n}', back_text=f'Definition of term {n}')
+    elif card_type == 'fill_gap':
+        row.update(question_text=f'Sentence {n} is missing a ___ here.', answers_json=json.dumps([f'word{n}']))
+    else:
+        row.update(
+            question_text=f'Question {n}?',
+            options_json=json.dumps([f'Option {n}.{i}' for i in range(4)]),
+            correct_index=n % 4,
+            explanation_text=f'Option {n}.{n % 4} is correct.'
+        )
+    return row
+
+
+def generate(scale):
+    """Bulk insert a synthetic school described by ``scale``. Needs an app context.
+
+    Rows are written with executemany inserts and explicit ids, so the run is
+    repeatable for a given seed and works on top of existing data. Returns the
+    number of rows written per table.
+    """
+    rng = random.Random(scale.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    today = now.date()
+    password_hash = passwords.hash_password(PASSWORD)
+
+    user_id, class_id, deck_id, card_id, result_id = (
+        _next_id(User), _next_id(Class), _next_id(Deck), _next_id(Card), _next_id(StudyResult)
+    )
+    users, classes, members, decks, cards, progress, results = [], [], [], [], [], [], []
+
+    for _ in range(scale.teachers):
+        teacher_id = user_id
+        user_id += 1
+        users.append({'id': teacher_id, 'email': f'teacher{teacher_id}@bench.example', 'role': 'teacher',
+                      'password_hash': password_hash, 'created_at': now})
+
+        for _ in range(scale.classes_per_teacher):
+            classes.append({'id': class_id, 'teacher_id': teacher_id, 'name': f'Class {class_id}',
+                            'invite_code': _invite_code(class_id), 'created_at': now})
+
+            class_cards = []
+            for d in range(scale.decks_per_class):
+                question_type = QUESTION_TYPES[d % len(QUESTION_TYPES)]
+                decks.append({'id': deck_id, 'owner_id': teacher_id, 'title': f'Class deck {deck_id}',
+                              'description': 'Synthetic benchmark deck', 'visibility': 'class',
+                              'question_type': question_type, 'class_id': class_id, 'created_at': now,
+                              'updated_at': now, 'content_version': 0})
+                for n in range(scale.cards_per_deck):
+                    cards.append(_card_row(card_id, deck_id, question_type, n, now))
+                    class_cards.append((card_id, deck_id, question_type))
+                    card_id += 1
+                deck_id += 1
+
+            for _ in range(scale.students_per_class):
+                student_id = user_id
+                user_id += 1
+                users.append({'id': student_id, 'email': f'student{student_id}@bench.example', 'role': 'student',
+                              'password_hash': password_hash, 'created_at': now})
+                members.append({'class_id': class_id, 'student_id': student_id, 'joined_at': now})
+
+                for _ in range(scale.private_decks_per_student):
+                    decks.append({'id': deck_id, 'owner_id': student_id, 'title': f'My deck {deck_id}',
+                                  'description': None, 'visibility': 'private', 'question_type': 'flashcard',
+                                  'class_id': None, 'created_at': now, 'updated_at': now,
+                                  'content_version': 0})
+                    for n in range(scale.cards_per_deck):
+                        cards.append(_card_row(card_id, deck_id, 'flashcard', n, now))
+                        card_id += 1
+                    deck_id += 1
+
+                for progress_card_id, _, _ in class_cards:
+                    if rng.random() >= scale.progress_ratio:
+                        continue
+                    interval = rng.randint(1, 60)
+                    progress.append({
+                        'user_id': student_id, 'card_id': progress_card_id,
+                        'next_review_date': today + timedelta(days=rng.randint(-10, 30)),
+                        'ease_factor': round(rng.uniform(1.3, 2.8), 2),
+                        'interval_days': interval, 'repetitions': rng.randint(1, 10),
+                    })
+
+                class_deck_types = sorted({(deck, question_type) for _, deck, question_type in class_cards})
+                for week in range(scale.years * 52):
+                    for _ in range(scale.results_per_week):
+                        result_deck, question_type = rng.choice(class_deck_types)
+                        completed_at = now - timedelta(weeks=week, seconds=rng.randint(0, 7 * 24 * 3600))
+                        results.append({
+                            'id': result_id, 'user_id': student_id, 'deck_id': result_deck,
+                            'score': rng.randint(0, 10), 'max_score': 10,
+                            'question_type': question_type, 'completed_at': completed_at,
+                        })
+                        result_id += 1
+            class_id += 1
+
+    counts = {
+        'users': _insert(User, users),
+        'classes': _insert(Class, classes),
+        'class_members': _insert(ClassMember, members),
+        'decks': _insert(Deck, decks),
+        'cards': _insert(Card, cards),
+        'card_progress': _insert(CardProgress, progress),
+        'study_results': _insert(StudyResult, results),
+    }
+    counts['study_daily_rollup'] = rollup.backfill()
+    db.session.commit()
+    return counts
+
+
+def main():
+    defaults = Scale()
+    parser = argparse.ArgumentParser(description='Bulk generate synthetic teachers, classes, students, decks, '
+                                                 'cards, progress and study history.')
+    for name, value in asdict(defaults).items():
+        parser.add_argument('--' + name.replace('_', '-'), type=type(value), default=value)
+    args = parser.parse_args()
+    scale = Scale(**{name: getattr(args, name) for name in asdict(defaults)})
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate(scale)
+        elapsed = time.perf_counter() - started
+
+    for table, count in counts.items():
+        print(f"{table:20s} {count:>10,}")
+    print(f"Generated {sum(counts.values()):,} rows in {elapsed:.1f}s. Accounts use the password '{PASSWORD}'.")
+
+
+if __name__ == "__main__":
+    main()
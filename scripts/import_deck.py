@@ -0,0 +1,43 @@
+import argparse
+import sys
+import os
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Deck
+from app.services.importer import detect_format, import_cards, IMPORT_BATCH_SIZE, IMPORT_FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import cards into a deck from CSV or JSON Lines.')
+    parser.add_argument('deck_id', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=IMPORT_FORMATS, help='defaults to the file extension')
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        print("Could not tell the format from the file name; pass --format csv or --format jsonl.")
+        sys.exit(1)
+
+    app = create_app()
+    with app.app_context():
+        deck = db.session.get(Deck, args.deck_id)
+        if not deck:
+            print(f"Deck {args.deck_id} not found.")
+            sys.exit(1)
+
+        print(f"Importing {args.path} into '{deck.title}' ({deck.question_type})...")
+        with open(args.path, 'rb') as f:
+            report = import_cards(deck, f, fmt, batch_size=args.batch_size)
+
+        print(report.summary())
+        for error in report.errors:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
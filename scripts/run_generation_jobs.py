@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Insert project directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import GenerationJob
+from app.services import generation
+
+# Runs AI generation jobs left queued, or stuck running past AI_JOB_TIMEOUT
+# (e.g. by a crash or server restart), to completion.
+app = create_app()
+
+with app.app_context():
+    job_ids = generation.pending_job_ids(app.config['AI_JOB_TIMEOUT'])
+    print(f"Found {len(job_ids)} queued or stale generation jobs.")
+
+    worker = generation.runner(app)
+    for job_id in job_ids:
+        worker.run(job_id)
+        job = db.session.get(GenerationJob, job_id)
+        db.session.refresh(job)
+        print(f"Job {job_id}: {job.status} ({job.cards_created} cards){' - ' + job.error if job.error else ''}")
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, date
 import random
 from app import create_app, db
 from app.models import User, Deck, StudyResult
+from app.services import rollup
 
 # Add the project root to the python path to import app modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -58,6 +59,7 @@ def seed_stats(email):
                         completed_at=completed_at
                     )
                     db.session.add(result)
+                    rollup.record_result(result)
                     records_created += 1
             
             current_date += timedelta(days=1)
@@ -0,0 +1,69 @@
+"""The hot queries must keep using their indexes (checked with EXPLAIN QUERY PLAN)."""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import and_
+
+from app import create_app, db
+from app.models import Card, CardProgress, Deck, StudyResult
+from config import Config
+
+
+class ExplainConfig(Config):
+    # Plans are checked against a fresh in-memory schema, never the real database
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TESTING = True
+
+
+def _today_end():
+    return datetime.combine(date.today(), datetime.max.time())
+
+
+# (label, query builder, index the plan must use)
+CHECKS = [
+    ('dashboard due cards',
+     lambda: CardProgress.query.filter(CardProgress.user_id == 1, CardProgress.next_review_date <= date.today()),
+     'ix_card_progress_user_next_review'),
+    ('due-only session reviews',
+     lambda: Card.query.join(
+         CardProgress, and_(CardProgress.card_id == Card.id, CardProgress.user_id == 1)
+     ).filter(Card.deck_id == 1, CardProgress.next_review_date <= date.today()),
+     'ix_card_progress_user_next_review'),
+    ('stats range scan',
+     lambda: StudyResult.query.filter(
+         StudyResult.user_id == 1,
+         StudyResult.completed_at >= datetime(date.today().year, 1, 1),
+         StudyResult.completed_at <= _today_end(),
+         StudyResult.question_type.in_(['mcq', 'fill_gap'])
+     ),
+     'ix_study_results_user_completed_type'),
+    ('deck cards',
+     lambda: Card.query.filter(Card.deck_id == 1),
+     'ix_cards_deck_id'),
+    ('private decks',
+     lambda: Deck.query.filter_by(owner_id=1, visibility='private'),
+     'ix_decks_owner_visibility'),
+    ('class decks',
+     lambda: Deck.query.filter(Deck.visibility == 'class', Deck.class_id.in_([1, 2])),
+     'ix_decks_class_visibility'),
+]
+
+
+@pytest.fixture(scope='module')
+def app():
+    app = create_app(ExplainConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def explain(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('label, build_query, index_name', CHECKS, ids=[check[0] for check in CHECKS])
+def test_query_uses_index(app, label, build_query, index_name):
+    plan = explain(build_query())
+    assert index_name in plan, f'{label} no longer uses {index_name}: {plan}'